@@ -11,6 +11,7 @@ from src.cart.models import *
 from src.products.models import *
 from src.orders.models import *
 from src.payments.models import *
+from src.idempotency.models import *
 from src.db import Base, CreatedAt, UpdatedAt
 
 # this is the Alembic Config object, which provides
@@ -29,6 +30,19 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 config.set_main_option("sqlalchemy.url", settings_db.DATABASE_URL + "?async_fallback=True")
 
+# schema objects that exist only in migrations (see src/products/models.py)
+# and must not be dropped by autogenerate
+UNMAPPED_COLUMNS = {("products", "search_vector")}
+UNMAPPED_INDEXES = {"ix_products_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "column" and (object.table.name, name) in UNMAPPED_COLUMNS:
+        return False
+    if type_ == "index" and name in UNMAPPED_INDEXES:
+        return False
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +65,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -74,7 +89,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
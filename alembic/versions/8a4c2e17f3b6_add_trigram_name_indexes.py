@@ -0,0 +1,31 @@
+"""add trigram name indexes
+
+Revision ID: 8a4c2e17f3b6
+Revises: 3d91f0a6c2e8
+Create Date: 2026-10-18 11:47:52.918340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4c2e17f3b6'
+down_revision: Union[str, Sequence[str], None] = '3d91f0a6c2e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_categories_name_trgm', 'categories', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_products_name_trgm', 'products', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # the pg_trgm extension is left installed, other objects may depend on it
+    op.drop_index('ix_products_name_trgm', table_name='products', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.drop_index('ix_categories_name_trgm', table_name='categories', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
@@ -0,0 +1,30 @@
+"""add order history index
+
+Revision ID: a9d24f6b1c37
+Revises: e1a7c3b95d42
+Create Date: 2026-10-18 17:11:09.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d24f6b1c37'
+down_revision: Union[str, Sequence[str], None] = 'e1a7c3b95d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_orders_user_created', 'orders', ['user_id', 'created_at', 'id'], unique=False, postgresql_include=['status', 'total_amount', 'updated_at'])
+    # a prefix of the new index
+    op.drop_index(op.f('ix_orders_user_id'), table_name='orders')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.drop_index('ix_orders_user_created', table_name='orders', postgresql_include=['status', 'total_amount', 'updated_at'])
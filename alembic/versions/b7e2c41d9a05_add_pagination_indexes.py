@@ -0,0 +1,29 @@
+"""add pagination indexes
+
+Revision ID: b7e2c41d9a05
+Revises: f4f513896fdb
+Create Date: 2026-10-18 10:12:41.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c41d9a05'
+down_revision: Union[str, Sequence[str], None] = 'f4f513896fdb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_categories_created_at_id', 'categories', ['created_at', 'id'], unique=False)
+    op.create_index('ix_products_created_at_id', 'products', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_created_at_id', table_name='products')
+    op.drop_index('ix_categories_created_at_id', table_name='categories')
@@ -0,0 +1,38 @@
+"""add product listing indexes
+
+Revision ID: c5f8d3a9e214
+Revises: 8a4c2e17f3b6
+Create Date: 2026-10-18 13:25:06.771942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f8d3a9e214'
+down_revision: Union[str, Sequence[str], None] = '8a4c2e17f3b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_products_price_cents_id', 'products', ['price_cents', 'id'], unique=False)
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_products_category_active_price', 'products', ['category_id', 'is_active', 'price_cents', 'id'], unique=False)
+    op.create_index('ix_products_category_active_created', 'products', ['category_id', 'is_active', 'created_at', 'id'], unique=False)
+    op.create_index('ix_products_in_stock_created', 'products', ['created_at', 'id'], unique=False, postgresql_where=sa.text('is_active AND stock > 0'))
+    op.create_index('ix_products_in_stock_price', 'products', ['price_cents', 'id'], unique=False, postgresql_where=sa.text('is_active AND stock > 0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_in_stock_price', table_name='products', postgresql_where=sa.text('is_active AND stock > 0'))
+    op.drop_index('ix_products_in_stock_created', table_name='products', postgresql_where=sa.text('is_active AND stock > 0'))
+    op.drop_index('ix_products_category_active_created', table_name='products')
+    op.drop_index('ix_products_category_active_price', table_name='products')
+    op.drop_index('ix_products_name_id', table_name='products')
+    op.drop_index('ix_products_price_cents_id', table_name='products')
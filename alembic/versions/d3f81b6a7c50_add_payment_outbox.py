@@ -0,0 +1,41 @@
+"""add payment outbox
+
+Revision ID: d3f81b6a7c50
+Revises: a9d24f6b1c37
+Create Date: 2026-10-18 18:40:27.663015
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f81b6a7c50'
+down_revision: Union[str, Sequence[str], None] = 'a9d24f6b1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payment_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('payment_id', sa.UUID(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('needs_reconciliation', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['payment_id'], ['payments.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('payment_id')
+    )
+    op.create_index(op.f('ix_payment_outbox_available_at'), 'payment_outbox', ['available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_payment_outbox_available_at'), table_name='payment_outbox')
+    op.drop_table('payment_outbox')
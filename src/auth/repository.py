@@ -9,9 +9,19 @@ class AuthRepository:
     def __init__(self, session: AsyncSession):
         self.session = session 
 
+    async def commit(self):
+        await self.session.commit()
+
 class UserRepository(SqlAlchemyCRUDRepository):
     model = User
 
+    async def create_with_cart(self, data: dict) -> User:
+        """Insert the user and their empty cart in one flush"""
+        user = self.model(**data, cart=Cart())
+        self.session.add(user)
+        await self.session.flush()
+        return user
+
     async def set_login_time(self, user: User):
         user.last_login = datetime.now(tz=timezone.utc)
-        await self.session.commit()
\ No newline at end of file
+        await self.session.flush()
\ No newline at end of file
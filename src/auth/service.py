@@ -13,14 +13,10 @@ class UserService:
         self.repository = repository
     
     async def get_user_by_username(self, username: str) -> User:
-        users = await self.repository.find_one_or_many(email=username)
-        if users:
-            return users[0]
-        else:
-            return None
+        return await self.repository.find_first(email=username)
 
     async def create_new_user(self, data: dict) -> User:
-        return await self.repository.create(data)
+        return await self.repository.create_with_cart(data)
     
     async def set_login_time(self, user: User):
         await self.repository.set_login_time(user)
@@ -61,6 +57,7 @@ class AuthService:
         access_token = await self.create_access_token(user)
         refresh_token = await self.create_refresh_token(user)
         await self.user_service.set_login_time(user)
+        await self.repository.commit()
         
         return Token(access_token=access_token, refresh_token=refresh_token, token_type='bearer')
     
@@ -75,6 +72,7 @@ class AuthService:
         data = new_user.model_dump(exclude=["password_confirm"])
         data["password"] = hash_password(data["password"])
         user = await self.user_service.create_new_user(data)
+        await self.repository.commit()
         return user 
 
     async def decode_token(self, token: str):
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+# every named cache of the process, for stats and cross-cutting invalidation
+CACHES: dict[str, "LRUCache"] = {}
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded in-process cache with least-recently-used eviction and a TTL.
+
+    Entries can carry tags (e.g. ("products", id)) so every entry derived from
+    a row is dropped with one invalidate_tag call. Safe to share between
+    coroutines: only get_or_load awaits, and it guards the loader so a burst
+    of misses on one key runs it once.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: str | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any, tuple]] = OrderedDict()
+        self._tags: dict[Hashable, set[Hashable]] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        # bumped by every invalidation, so a load racing with a write is not stored
+        self._generation = 0
+        if name is not None:
+            CACHES[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._discard(key)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        self._discard(key)
+        tags = tuple(tags)
+        self._data[key] = (time.monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._discard(oldest)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[Hashable] | Callable[[Any], Iterable[Hashable]] = (),
+    ) -> Any:
+        """Read-through lookup with a single-flight guard.
+
+        Concurrent callers missing on the same key wait for the first one's
+        loader instead of issuing their own. None results are not cached.
+        """
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # the loading caller was cancelled, not us: try again
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved, even if nobody was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if value is not None and generation == self._generation:
+            self.set(key, value, tags(value) if callable(tags) else tags)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        self._discard(key)
+
+    def invalidate_tag(self, tag: Hashable) -> None:
+        self._generation += 1
+        for key in self._tags.pop(tag, ()):
+            self._discard(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
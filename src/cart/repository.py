@@ -1,24 +1,179 @@
 # src/cart/repository.py
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from uuid import uuid4
+
+from sqlalchemy import Uuid, delete, func, literal, select
 
 from src.cart.models import Cart, CartItem
-from src.utils import SqlAlchemyCRUDRepository
+from src.products.models import Product
+from src.utils import SqlAlchemyCRUDRepository, dialect_insert
 
 
 class CartRepository(SqlAlchemyCRUDRepository):
     model = Cart
 
+    async def get_quantities(self, user_id):
+        """Lock the user's cart and read its product quantities.
+
+        Returns (cart id, {product id: quantity}), or (None, {}) without a
+        cart. The cart row lock is the mutex of every read-modify-write of
+        the cart's items (add_quantity takes it too), so quantities computed
+        from this read cannot lose a concurrent add. The items are read in a
+        second statement, which sees everything committed while it waited.
+        """
+        lock = select(Cart.id).where(Cart.user_id == user_id).with_for_update(key_share=True)
+        cart_id = (await self.session.execute(lock)).scalar_one_or_none()
+        if cart_id is None:
+            return None, {}
+        query = select(CartItem.product_id, CartItem.quantity).where(CartItem.cart_id == cart_id)
+        result = await self.session.execute(query)
+        return cart_id, dict(result.all())
+
+    async def get_cart_view(self, user_id):
+        """The user's cart as flat rows, one per item, in a single query.
+
+        Every row repeats the cart columns and the cart totals (window sums);
+        an empty cart is one row with NULL item columns, and a user without
+        a cart gets no rows.
+        """
+        subtotal = Product.price_cents * CartItem.quantity
+        query = (
+            select(
+                Cart.id.label("cart_id"),
+                Cart.created_at,
+                Cart.updated_at,
+                CartItem.id.label("item_id"),
+                CartItem.quantity,
+                Product.id.label("product_id"),
+                Product.name,
+                Product.price_cents,
+                Product.stock,
+                Product.is_active,
+                subtotal.label("subtotal"),
+                func.coalesce(func.sum(CartItem.quantity).over(), 0).label("total_items"),
+                func.coalesce(func.sum(subtotal).over(), 0).label("total_price_cents"),
+            )
+            .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+            .outerjoin(Product, Product.id == CartItem.product_id)
+            .where(Cart.user_id == user_id)
+            .order_by(CartItem.added_at, CartItem.id)
+        )
+        result = await self.session.execute(query)
+        return result.mappings().all()
+
 
 class CartItemRepository(SqlAlchemyCRUDRepository):
     model = CartItem
 
-    async def get_cart_items_with_products(self, cart_id):
-        """Get all cart items with their associated products"""
+    async def add_quantity(self, user_id, product_id, quantity: int):
+        """Add `quantity` of a product to the user's cart in one statement.
+
+        INSERT ... SELECT joins the user's cart to the product, so nothing is
+        written unless the product is active and has enough stock; on a
+        (cart_id, product_id) conflict the quantity is incremented, again only
+        within stock. The SELECT locks the cart row, the lock batch updates
+        take in get_quantities, so concurrent writes to one cart serialize
+        and each sees the other's committed quantity. Returns the resulting
+        item row, or None when a check failed or the user has no cart yet.
+        """
+        table = self.model.__table__
+        source = (
+            select(
+                literal(uuid4(), Uuid).label("id"),
+                Cart.id.label("cart_id"),
+                Product.id.label("product_id"),
+                literal(quantity).label("quantity"),
+            )
+            .join(Product, Product.id == product_id)
+            .where(Cart.user_id == user_id)
+            .where(Product.is_active.is_(True))
+            .where(Product.stock >= quantity)
+            # serializes with batch updates of the same cart, see get_quantities
+            .with_for_update(of=Cart, key_share=True)
+        )
+        stmt = dialect_insert(self.session, table).from_select(
+            ["id", "cart_id", "product_id", "quantity"], source
+        )
+        new_quantity = table.c.quantity + stmt.excluded.quantity
+        stock = select(Product.stock).where(Product.id == product_id).scalar_subquery()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.cart_id, table.c.product_id],
+            set_={"quantity": new_quantity},
+            where=stock >= new_quantity,
+        ).returning(*table.c)
+        result = await self.session.execute(stmt)
+        return result.mappings().first()
+
+    async def find_checkout_violations(self, user_id, lock: bool = False):
+        """Cart lines that cannot be ordered: inactive products or short stock.
+
+        One query joining the user's cart items to products; only the
+        violating lines come back, with the stock available. With `lock`,
+        every product in the cart (not just the violating ones) is locked
+        FOR SHARE until the transaction ends, so a clean result stays true
+        while the order is created.
+        """
+        lines = (
+            select(
+                CartItem.product_id,
+                CartItem.quantity,
+                Product.name,
+                Product.is_active,
+                Product.stock,
+            )
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .join(Product, Product.id == CartItem.product_id)
+            .where(Cart.user_id == user_id)
+        )
+        if not lock:
+            query = lines.where(
+                ~Product.is_active | (Product.stock < CartItem.quantity)
+            ).order_by(Product.id)
+        else:
+            # lock in id order; materialized so the filter is not pushed under the lock
+            lines = (
+                lines.order_by(Product.id)
+                .with_for_update(read=True, of=Product)
+                .cte("cart_lines")
+                .prefix_with("MATERIALIZED")
+            )
+            query = (
+                select(lines)
+                .where(~lines.c.is_active | (lines.c.stock < lines.c.quantity))
+                .order_by(lines.c.product_id)
+            )
+        result = await self.session.execute(query)
+        return result.mappings().all()
+
+    async def lock_checkout_lines(self, user_id):
+        """The user's cart lines with their products, locked FOR UPDATE.
+
+        Products are locked in id order, so concurrent checkouts sharing
+        products queue up instead of deadlocking. The cart item rows are
+        locked too: a second checkout of the same cart waits, then finds
+        the lines gone.
+        """
         query = (
-            select(self.model)
-            .where(self.model.cart_id == cart_id)
-            .options(joinedload(self.model.product))
+            select(
+                CartItem.cart_id,
+                CartItem.product_id,
+                CartItem.quantity,
+                Product.name,
+                Product.price_cents,
+                Product.is_active,
+                Product.stock,
+            )
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .join(Product, Product.id == CartItem.product_id)
+            .where(Cart.user_id == user_id)
+            .order_by(Product.id)
+            .with_for_update(of=(CartItem, Product))
         )
         result = await self.session.execute(query)
-        return result.scalars().all()
+        return result.mappings().all()
+
+    async def remove_products(self, cart_id, product_ids) -> None:
+        await self.session.execute(
+            delete(self.model)
+            .where(self.model.cart_id == cart_id)
+            .where(self.model.product_id.in_(product_ids))
+        )
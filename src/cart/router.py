@@ -1,25 +1,28 @@
 from uuid import UUID
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
 
 from src.auth.dependencies import CurrentUser
 from src.cart.dependencies import CartServiceDep
 from src.cart.schemas import *
+from src.responses import PRIVATE_CACHE_CONTROL, json_response
 
 router = APIRouter()
 
 
 @router.get("", response_model=CartOut)
-async def get_cart(service: CartServiceDep, current_user=CurrentUser):
+async def get_cart(request: Request, service: CartServiceDep, current_user: CurrentUser):
     """Get current user's cart with all items"""
-    return await service.get_cart_with_items(current_user.id)
+    cart = await service.get_cart_with_items(current_user.id)
+    body = CartOut.model_validate(cart).model_dump_json().encode()
+    return json_response(request, body, cache_control=PRIVATE_CACHE_CONTROL)
 
 
 @router.post("/items", status_code=status.HTTP_201_CREATED)
 async def add_to_cart(
     request: AddToCartRequest,
     service: CartServiceDep,
-    current_user=CurrentUser,
+    current_user: CurrentUser,
 ):
     """Add product to cart"""
     await service.add_item_to_cart(
@@ -28,12 +31,21 @@ async def add_to_cart(
     return {"message": "Item added to cart"}
 
 
+@router.patch("/items", response_model=CartOut)
+async def update_cart_items(
+    batch: CartBatchRequest, service: CartServiceDep, current_user: CurrentUser
+):
+    """Apply several add/set/remove operations in one transaction"""
+    operations = [operation.model_dump(mode="python") for operation in batch.operations]
+    return await service.apply_item_operations(current_user.id, operations)
+
+
 @router.put("/items/{cart_item_id}")
 async def update_cart_item(
     cart_item_id: UUID,
     request: UpdateCartItemRequest,
     service: CartServiceDep,
-    current_user=CurrentUser,
+    current_user: CurrentUser,
 ):
     """Update cart item quantity"""
     await service.update_item_quantity(current_user.id, cart_item_id, request.quantity)
@@ -42,13 +54,13 @@ async def update_cart_item(
 
 @router.delete("/items/{cart_item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_cart(
-    cart_item_id: UUID, service: CartServiceDep, current_user=CurrentUser
+    cart_item_id: UUID, service: CartServiceDep, current_user: CurrentUser
 ):
     """Remove item from cart"""
     await service.remove_item_from_cart(current_user.id, cart_item_id)
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def clear_cart(service: CartServiceDep, current_user=CurrentUser):
+async def clear_cart(service: CartServiceDep, current_user: CurrentUser):
     """Clear all items from cart"""
     await service.clear_cart(current_user.id)
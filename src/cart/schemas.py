@@ -1,7 +1,11 @@
 from datetime import datetime
+from enum import Enum
+from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+MAX_CART_OPERATIONS = 200
 
 
 class AddToCartRequest(BaseModel):
@@ -13,6 +17,31 @@ class UpdateCartItemRequest(BaseModel):
     quantity: int = Field(ge=1)
 
 
+class CartOperationType(str, Enum):
+    ADD = "add"
+    SET = "set"
+    REMOVE = "remove"
+
+
+class CartItemOperation(BaseModel):
+    op: CartOperationType
+    product_id: UUID
+    quantity: Optional[int] = Field(default=None, ge=1)
+
+    @model_validator(mode="after")
+    def check_quantity(self):
+        if self.op == CartOperationType.REMOVE:
+            if self.quantity is not None:
+                raise ValueError("remove takes no quantity")
+        elif self.quantity is None:
+            raise ValueError(f"{self.op.value} requires a quantity")
+        return self
+
+
+class CartBatchRequest(BaseModel):
+    operations: list[CartItemOperation] = Field(min_length=1, max_length=MAX_CART_OPERATIONS)
+
+
 class CartItemProductOut(BaseModel):
     id: UUID
     name: str
@@ -6,6 +6,22 @@ from src.cart.repository import CartItemRepository, CartRepository
 from src.products.repository import ProductRepository
 
 
+def checkout_errors(lines) -> list[dict]:
+    """Error entries for cart lines that cannot be ordered"""
+    errors = []
+    for line in lines:
+        if not line["is_active"]:
+            error = "Product is no longer available"
+        elif line["stock"] < line["quantity"]:
+            error = f"Insufficient stock. Available: {line['stock']}, requested: {line['quantity']}"
+        else:
+            continue
+        errors.append(
+            {"product_id": str(line["product_id"]), "product_name": line["name"], "error": error}
+        )
+    return errors
+
+
 class CartService:
     def __init__(
         self,
@@ -19,90 +35,132 @@ class CartService:
 
     async def get_or_create_cart(self, user_id: UUID) -> Cart:
         """Get user's cart or create if doesn't exist"""
-        carts = await self.cart_repo.find_one_or_many(user_id=user_id)
-        if carts:
-            return carts[0]
+        cart = await self.cart_repo.find_first(user_id=user_id)
+        if cart is not None:
+            return cart
 
         cart_data = {"user_id": user_id}
         return await self.cart_repo.create(cart_data)
 
     async def get_cart_with_items(self, user_id: UUID) -> dict:
-        """Get cart with all items and calculated totals"""
-        cart = await self.get_or_create_cart(user_id)
-        items = await self.cart_item_repo.get_cart_items_with_products(cart.id)
-
-        total_price = sum(item.product.price_cents * item.quantity for item in items)
-
+        """Get cart with all items and calculated totals, in one query"""
+        rows = await self.cart_repo.get_cart_view(user_id)
+        if not rows:
+            # carts are created at registration; this covers older accounts
+            await self.cart_repo.upsert_many([{"user_id": user_id}], conflict_cols=("user_id",))
+            await self.cart_repo.commit()
+            rows = await self.cart_repo.get_cart_view(user_id)
+
+        cart = rows[0]
         return {
-            "cart_id": cart.id,
+            "cart_id": cart["cart_id"],
             "items": [
                 {
-                    "id": item.id,
+                    "id": row["item_id"],
                     "product": {
-                        "id": item.product.id,
-                        "name": item.product.name,
-                        "price_cents": item.product.price_cents,
-                        "stock": item.product.stock,
-                        "is_active": item.product.is_active,
+                        "id": row["product_id"],
+                        "name": row["name"],
+                        "price_cents": row["price_cents"],
+                        "stock": row["stock"],
+                        "is_active": row["is_active"],
                     },
-                    "quantity": item.quantity,
-                    "subtotal": item.product.price_cents * item.quantity,
+                    "quantity": row["quantity"],
+                    "subtotal": row["subtotal"],
                 }
-                for item in items
+                for row in rows
+                if row["item_id"] is not None
             ],
-            "total_items": sum(item.quantity for item in items),
-            "total_price_cents": total_price,
-            "created_at": cart.created_at,
-            "updated_at": cart.updated_at,
+            "total_items": cart["total_items"],
+            "total_price_cents": cart["total_price_cents"],
+            "created_at": cart["created_at"],
+            "updated_at": cart["updated_at"],
         }
 
     async def add_item_to_cart(
         self, user_id: UUID, product_id: UUID, quantity: int = 1
-    ) -> CartItem:
-        """Add product to cart or update quantity if exists"""
+    ) -> dict:
+        """Add product to cart or increase its quantity, in one statement"""
         if quantity <= 0:
             raise InvalidQuantityException
 
-        # Verify product exists and is available
-        products = await self.product_repo.find_one_or_many(id=product_id)
-        if not products:
-            raise ProductNotFoundException
-
-        product = products[0]
-        if not product.is_active:
-            raise ProductNotAvailableException
-
-        if product.stock < quantity:
-            raise InsufficientStockException
-
-        # Get or create cart
-        cart = await self.get_or_create_cart(user_id)
-
-        # Check if item already exists in cart
-        existing_items = await self.cart_item_repo.find_one_or_many(
-            cart_id=cart.id, product_id=product_id
-        )
-
-        if existing_items:
-            # Update existing item
-            item = existing_items[0]
-            new_quantity = item.quantity + quantity
-
-            if product.stock < new_quantity:
+        item = await self.cart_item_repo.add_quantity(user_id, product_id, quantity)
+        if item is None:
+            # nothing written: find out which check failed
+            product = await self.product_repo.get_by_pk(product_id)
+            if product is None:
+                raise ProductNotFoundException
+            if not product.is_active:
+                raise ProductNotAvailableException
+            if not await self.cart_repo.exists(user_id=user_id):
+                await self.cart_repo.create({"user_id": user_id})
+                item = await self.cart_item_repo.add_quantity(user_id, product_id, quantity)
+            if item is None:
                 raise InsufficientStockException
 
-            updated = await self.cart_item_repo.update_one_or_more(
-                {"quantity": new_quantity}, id=item.id
+        await self.cart_item_repo.commit()
+        return item
+
+    async def apply_item_operations(self, user_id: UUID, operations: list[dict]) -> dict:
+        """Apply add/set/remove operations atomically and return the updated cart.
+
+        Operations are folded in order into one final quantity per product,
+        checked against a single products query, then written with one
+        delete and one upsert. Any failing product rejects the whole batch.
+        """
+        cart_id, quantities = await self.cart_repo.get_quantities(user_id)
+
+        final = {}
+        for operation in operations:
+            product_id = operation["product_id"]
+            current = final.get(product_id, quantities.get(product_id, 0))
+            if operation["op"] == "add":
+                final[product_id] = current + operation["quantity"]
+            elif operation["op"] == "set":
+                final[product_id] = operation["quantity"]
+            else:
+                final[product_id] = 0
+
+        products = await self.product_repo.get_stock_levels(list(final))
+        errors = []
+        for product_id, quantity in final.items():
+            product = products.get(product_id)
+            if product is None:
+                error = "Product not found"
+            elif quantity == 0:
+                continue
+            elif not product.is_active:
+                error = "Product is no longer available"
+            elif product.stock < quantity:
+                error = f"Insufficient stock. Available: {product.stock}, requested: {quantity}"
+            else:
+                continue
+            errors.append(
+                {
+                    "product_id": str(product_id),
+                    "product_name": product.name if product is not None else None,
+                    "error": error,
+                }
             )
-            return updated[0] if isinstance(updated, list) else updated
-        else:
-            # Create new item
-            item_data = {
-                "cart_id": cart.id,
-                "product_id": product_id,
-                "quantity": quantity,
-            }
-            return await self.cart_item_repo.create(item_data)
+        if errors:
+            raise CartValidationException(errors)
+
+        if cart_id is None:
+            cart_id = (await self.cart_repo.create({"user_id": user_id})).id
+
+        removed = [id for id, quantity in final.items() if quantity == 0 and id in quantities]
+        if removed:
+            await self.cart_item_repo.remove_products(cart_id, removed)
+        rows = [
+            {"cart_id": cart_id, "product_id": id, "quantity": quantity}
+            for id, quantity in final.items()
+            if quantity and quantity != quantities.get(id)
+        ]
+        if rows:
+            await self.cart_item_repo.upsert_many(
+                rows, conflict_cols=("cart_id", "product_id"), update_cols=("quantity",)
+            )
+        await self.cart_item_repo.commit()
+        return await self.get_cart_with_items(user_id)
 
     async def update_item_quantity(
         self, user_id: UUID, cart_item_id: UUID, quantity: int
@@ -114,27 +172,22 @@ class CartService:
         cart = await self.get_or_create_cart(user_id)
 
         # Verify item belongs to user's cart
-        items = await self.cart_item_repo.find_one_or_many(
-            id=cart_item_id, cart_id=cart.id
-        )
-
-        if not items:
+        item = await self.cart_item_repo.find_first(id=cart_item_id, cart_id=cart.id)
+        if item is None:
             raise CartItemNotFoundException
 
-        item = items[0]
-
         # Check stock availability
-        products = await self.product_repo.find_one_or_many(id=item.product_id)
-        if not products:
+        product = await self.product_repo.get_by_pk(item.product_id)
+        if product is None:
             raise ProductNotFoundException
 
-        product = products[0]
         if product.stock < quantity:
             raise InsufficientStockException
 
         updated = await self.cart_item_repo.update_one_or_more(
             {"quantity": quantity}, id=cart_item_id
         )
+        await self.cart_item_repo.commit()
         return updated[0] if isinstance(updated, list) else updated
 
     async def remove_item_from_cart(self, user_id: UUID, cart_item_id: UUID) -> None:
@@ -142,49 +195,29 @@ class CartService:
         cart = await self.get_or_create_cart(user_id)
 
         # Verify item belongs to user's cart
-        items = await self.cart_item_repo.find_one_or_many(
-            id=cart_item_id, cart_id=cart.id
-        )
-
-        if not items:
+        if not await self.cart_item_repo.exists(id=cart_item_id, cart_id=cart.id):
             raise CartItemNotFoundException
 
         await self.cart_item_repo.delete_one_or_more(id=cart_item_id)
+        await self.cart_item_repo.commit()
 
     async def clear_cart(self, user_id: UUID) -> None:
         """Remove all items from cart"""
         cart = await self.get_or_create_cart(user_id)
         await self.cart_item_repo.delete_one_or_more(cart_id=cart.id)
+        await self.cart_item_repo.commit()
 
-    async def validate_cart_for_checkout(self, user_id: UUID) -> dict:
-        """Validate cart items before checkout"""
-        cart_data = await self.get_cart_with_items(user_id)
+    async def validate_cart_for_checkout(self, user_id: UUID, lock: bool = False) -> dict:
+        """Validate cart items before checkout.
+
+        The database returns only the violating lines; with `lock` the cart's
+        products stay FOR SHARE locked until the caller's transaction ends.
+        """
+        violations = await self.cart_item_repo.find_checkout_violations(user_id, lock=lock)
+        if violations:
+            raise CartValidationException(checkout_errors(violations))
 
+        cart_data = await self.get_cart_with_items(user_id)
         if not cart_data["items"]:
             raise EmptyCartException
-
-        errors = []
-        for item in cart_data["items"]:
-            product = item["product"]
-
-            if not product["is_active"]:
-                errors.append(
-                    {
-                        "product_id": product["id"],
-                        "product_name": product["name"],
-                        "error": "Product is no longer available",
-                    }
-                )
-            elif product["stock"] < item["quantity"]:
-                errors.append(
-                    {
-                        "product_id": product["id"],
-                        "product_name": product["name"],
-                        "error": f"Insufficient stock. Available: {product['stock']}, requested: {item['quantity']}",
-                    }
-                )
-
-        if errors:
-            raise CartValidationException(errors)
-
         return cart_data
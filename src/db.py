@@ -4,13 +4,14 @@ from sqlalchemy import DateTime, text, func
 
 from src.config import settings_db
 from typing import AsyncGenerator, Annotated
-from datetime import datetime, timezone
+from datetime import datetime
 
 async_engine = create_async_engine(
     url=settings_db.DATABASE_URL,
 )
 
-async_session_maker = async_sessionmaker(bind=async_engine)
+# objects returned by statement-based writes stay readable after commit
+async_session_maker = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -23,7 +24,9 @@ CreatedAt = Annotated[datetime, mapped_column(DateTime(timezone=True), server_de
                                               nullable=False)]
 UpdatedAt = Annotated[datetime, mapped_column(DateTime(timezone=True), server_default=func.now(), 
                                               nullable=False, 
-                                              onupdate=datetime.now(tz=timezone.utc))]
+                                              onupdate=func.now())]
 
 class Base(DeclarativeBase):
-    pass 
\ No newline at end of file
+    # server-generated columns (created_at, updated_at) come back through
+    # RETURNING at flush time, so written objects need no refresh
+    __mapper_args__ = {"eager_defaults": True} 
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""Idempotency key maintenance.
+
+    python -m src.idempotency.cli sweep
+    python -m src.idempotency.cli sweep --batch-size 5000
+
+Meant to run periodically (cron, a k8s CronJob); each batch is its own
+short transaction so the sweep never holds many row locks.
+"""
+import argparse
+import asyncio
+
+from src.db import async_session_maker
+from src.idempotency.repository import IdempotencyRepository
+from src.idempotency.service import SWEEP_BATCH_SIZE, IdempotencyService
+
+
+async def sweep(batch_size: int) -> int:
+    async with async_session_maker() as session:
+        service = IdempotencyService(IdempotencyRepository(session=session))
+        return await service.sweep(batch_size=batch_size)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.idempotency.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep_parser = commands.add_parser("sweep", help="delete expired idempotency keys")
+    sweep_parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH_SIZE)
+
+    args = parser.parse_args(argv)
+    deleted = asyncio.run(sweep(args.batch_size))
+    print(f"deleted {deleted} expired idempotency keys")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
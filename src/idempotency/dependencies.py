@@ -0,0 +1,25 @@
+from typing import Annotated
+
+from fastapi import Depends, Header
+
+from src.db import AsyncSession, get_session
+from src.idempotency.repository import IdempotencyRepository
+from src.idempotency.service import IdempotencyService
+
+
+async def get_idempotency_repository(
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> IdempotencyRepository:
+    return IdempotencyRepository(session=session)
+
+
+async def get_idempotency_service(
+    repository: Annotated[IdempotencyRepository, Depends(get_idempotency_repository)],
+) -> IdempotencyService:
+    return IdempotencyService(repository=repository)
+
+
+IdempotencyServiceDep = Annotated[IdempotencyService, Depends(get_idempotency_service)]
+IdempotencyKeyHeader = Annotated[
+    str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+]
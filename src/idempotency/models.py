@@ -0,0 +1,30 @@
+from datetime import datetime
+from uuid import UUID as UID
+
+from sqlalchemy import UUID, DateTime, ForeignKey, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db import Base, CreatedAt
+
+
+class IdempotencyKey(Base):
+    """The first response to a request sent with an Idempotency-Key header.
+
+    status_code and response_body stay NULL while the original request is
+    in flight; locked_until bounds how long that claim holds if its worker
+    dies, expires_at when the key can be reused and the row swept.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[UID] = mapped_column(UUID(as_uuid=True),
+                                          ForeignKey("users.id", ondelete="CASCADE"),
+                                          primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_body: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    locked_until: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+    created_at: Mapped[CreatedAt]
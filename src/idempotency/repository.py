@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, tuple_, update
+
+from src.idempotency.models import IdempotencyKey
+from src.utils import SqlAlchemyCRUDRepository, dialect_insert
+
+
+class IdempotencyRepository(SqlAlchemyCRUDRepository):
+    model = IdempotencyKey
+
+    async def claim(self, user_id, key: str, fingerprint: str, now: datetime,
+                    ttl: timedelta, lease: timedelta) -> bool:
+        """Take the key for a new request, in one statement.
+
+        Succeeds for an unused key, an expired one, or an in-flight claim
+        whose lease ran out. A concurrent INSERT of the same key waits on
+        the unique index until this claim commits.
+        """
+        table = self.model.__table__
+        stmt = dialect_insert(self.session, self.model).values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            locked_until=now + lease,
+            expires_at=now + ttl,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.key],
+            set_={
+                "fingerprint": stmt.excluded.fingerprint,
+                "status_code": None,
+                "response_body": None,
+                "locked_until": stmt.excluded.locked_until,
+                "expires_at": stmt.excluded.expires_at,
+            },
+            where=(table.c.expires_at < now)
+            | (table.c.status_code.is_(None) & (table.c.locked_until < now)),
+        ).returning(table.c.key)
+        result = await self.session.execute(stmt)
+        return result.first() is not None
+
+    async def get_record(self, user_id, key: str):
+        """Columns only: polling must not be answered from the identity map"""
+        table = self.model.__table__
+        query = select(
+            table.c.fingerprint, table.c.status_code, table.c.response_body
+        ).where(table.c.user_id == user_id, table.c.key == key)
+        result = await self.session.execute(query)
+        return result.mappings().first()
+
+    async def save_response(self, user_id, key: str, status_code: int, body: bytes) -> None:
+        table = self.model.__table__
+        await self.session.execute(
+            update(table)
+            .where(table.c.user_id == user_id, table.c.key == key)
+            .values(status_code=status_code, response_body=body)
+        )
+
+    async def release(self, user_id, key: str) -> None:
+        """Drop an in-flight claim so a retry runs the request again"""
+        table = self.model.__table__
+        await self.session.execute(
+            delete(table).where(
+                table.c.user_id == user_id, table.c.key == key, table.c.status_code.is_(None)
+            )
+        )
+
+    async def delete_expired(self, now: datetime, batch_size: int) -> int:
+        table = self.model.__table__
+        expired = (
+            select(table.c.user_id, table.c.key)
+            .where(table.c.expires_at < now)
+            .limit(batch_size)
+        )
+        result = await self.session.execute(
+            delete(table).where(tuple_(table.c.user_id, table.c.key).in_(expired))
+        )
+        return result.rowcount
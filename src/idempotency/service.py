@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from fastapi import Request, Response
+
+from src.idempotency.exceptions import (
+    IdempotencyKeyReusedException,
+    IdempotencyRequestInProgressException,
+)
+from src.idempotency.repository import IdempotencyRepository
+
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# an in-flight claim older than this is presumed abandoned by a dead worker
+IDEMPOTENCY_LEASE = timedelta(seconds=60)
+# how long a duplicate waits for the original before answering 409, in seconds
+IDEMPOTENCY_WAIT = 10.0
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+SWEEP_BATCH_SIZE = 1000
+
+# stores the response body in the operation's own transaction
+SaveResponse = Callable[[bytes], Awaitable[None]]
+Operation = Callable[[SaveResponse], Awaitable[bytes]]
+
+
+async def _skip_saving(body: bytes) -> None:
+    pass
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class IdempotencyService:
+    def __init__(self, repository: IdempotencyRepository):
+        self.repository = repository
+
+    async def respond(
+        self,
+        request: Request,
+        user_id: UUID,
+        key: str | None,
+        operation: Operation,
+        status_code: int,
+    ) -> Response:
+        """JSON response of `operation`, run at most once per Idempotency-Key.
+
+        Without a key the operation simply runs; replays carry an
+        Idempotent-Replayed header.
+        """
+        if key is None:
+            body = await operation(_skip_saving)
+            return Response(content=body, status_code=status_code, media_type="application/json")
+
+        fingerprint = request_fingerprint(request.method, request.url.path, await request.body())
+        status_code, body, replayed = await self.run(user_id, key, fingerprint, operation, status_code)
+        headers = {"Idempotent-Replayed": "true"} if replayed else None
+        return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+    async def run(self, user_id: UUID, key: str, fingerprint: str,
+                  operation: Operation, status_code: int) -> tuple[int, bytes, bool]:
+        """Run `operation` once for (user, key), or replay its stored result.
+
+        The claim is committed before the operation starts, so a duplicate
+        arriving meanwhile finds it and polls until the response is stored.
+        The operation is handed a save callback and must await it before its
+        own commit, so its writes and the stored response commit together. A
+        failed operation releases the key. Returns (status code, body,
+        replayed).
+        """
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT
+        delay = IDEMPOTENCY_POLL_INTERVAL
+        while True:
+            claimed = await self.repository.claim(
+                user_id, key, fingerprint, datetime.now(timezone.utc), IDEMPOTENCY_TTL, IDEMPOTENCY_LEASE
+            )
+            await self.repository.commit()
+            if claimed:
+                break
+
+            record = await self.repository.get_record(user_id, key)
+            if record is None:
+                # released or swept between the two statements
+                continue
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyKeyReusedException
+            if record["status_code"] is not None:
+                return record["status_code"], record["response_body"], True
+            if time.monotonic() >= deadline:
+                raise IdempotencyRequestInProgressException
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+        async def save(body: bytes) -> None:
+            await self.repository.save_response(user_id, key, status_code, body)
+
+        # a cancelled operation may have committed, so its claim is kept and
+        # taken over once the lease runs out
+        try:
+            body = await operation(save)
+        except Exception:
+            # release leaves a key alone once its response is stored, i.e.
+            # when the operation committed before failing
+            await self.repository.rollback()
+            await self.repository.release(user_id, key)
+            await self.repository.commit()
+            raise
+        return status_code, body, False
+
+    async def sweep(self, batch_size: int | None = None) -> int:
+        """Delete expired keys in batches, one short transaction each"""
+        batch_size = batch_size or SWEEP_BATCH_SIZE
+        now = datetime.now(timezone.utc)
+        total = 0
+        while True:
+            deleted = await self.repository.delete_expired(now, batch_size)
+            await self.repository.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
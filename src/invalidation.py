@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from typing import Callable, Iterable
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.cache import CACHES
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# Session.info key: {table: ids} written by the open transaction
+PENDING_EVICTIONS = "pending_cache_evictions"
+# NOTIFY payloads must stay under 8000 bytes; ~200 uuids per message
+MAX_PAYLOAD_BYTES = 7900
+
+
+def encode_messages(table: str, ids: Iterable) -> list[str]:
+    """Pack "table:id,id,..." payloads, split to respect the NOTIFY size limit"""
+    messages = []
+    current = []
+    size = len(table) + 1
+    for id in map(str, ids):
+        if current and size + len(id) + 1 > MAX_PAYLOAD_BYTES:
+            messages.append(f"{table}:{','.join(current)}")
+            current = []
+            size = len(table) + 1
+        current.append(id)
+        size += len(id) + 1
+    if current:
+        messages.append(f"{table}:{','.join(current)}")
+    return messages
+
+
+def decode_message(payload: str) -> tuple[str, list[UUID]]:
+    table, _, ids = payload.partition(":")
+    return table, [UUID(id) for id in ids.split(",") if id]
+
+
+class LocalTransport:
+    """In-memory stand-in for LISTEN/NOTIFY.
+
+    Buses started on transports sharing one `channel` list receive each
+    other's messages, like workers sharing a database. Delivery happens at
+    publish time rather than at commit.
+    """
+
+    def __init__(self, channel: list | None = None):
+        self.channel = channel if channel is not None else []
+        self._listener = None
+
+    async def start(self, listener: Callable[[str], None], on_connect: Callable[[], None]):
+        self._listener = listener
+        self.channel.append(listener)
+        on_connect()
+
+    async def stop(self):
+        if self._listener in self.channel:
+            self.channel.remove(self._listener)
+        self._listener = None
+
+    async def publish(self, session: AsyncSession, payload: str):
+        for listener in list(self.channel):
+            listener(payload)
+
+
+class PostgresTransport:
+    """NOTIFY inside the writing transaction, LISTEN on a dedicated connection.
+
+    Postgres delivers notifications only once the writing transaction
+    commits, so no worker evicts before the new row is visible. Every
+    (re)connect calls on_connect, since messages sent while disconnected are
+    lost.
+    """
+
+    def __init__(self, dsn: str, channel: str = CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+
+    async def start(self, listener: Callable[[str], None], on_connect: Callable[[], None]):
+        self._task = asyncio.create_task(self._listen(listener, on_connect))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self, session: AsyncSession, payload: str):
+        await session.execute(select(func.pg_notify(self.channel, payload)))
+
+    async def _listen(self, listener, on_connect):
+        delay = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda conn: closed.set())
+                await connection.add_listener(
+                    self.channel, lambda conn, pid, channel, payload: listener(payload)
+                )
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+                if connection is not None:
+                    connection.terminate()
+                logger.warning("invalidation listener cannot connect, retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            delay = 1
+            try:
+                on_connect()
+                await closed.wait()
+                logger.warning("invalidation listener lost its connection")
+            finally:
+                await connection.close()
+
+
+class InvalidationBus:
+    def __init__(self, transport=None):
+        self.transport = transport or LocalTransport()
+        self._handlers: list[Callable[[str, list], None]] = []
+        self._reset_handlers: list[Callable[[], None]] = []
+
+    def subscribe(self, handler: Callable[[str, list], None], on_reset: Callable[[], None] | None = None):
+        self._handlers.append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    async def start(self, transport=None):
+        if transport is not None:
+            self.transport = transport
+        await self.transport.start(self.dispatch, self.reset)
+
+    async def stop(self):
+        await self.transport.stop()
+
+    async def publish(self, session: AsyncSession, table: str, ids: Iterable):
+        for payload in encode_messages(table, ids):
+            await self.transport.publish(session, payload)
+
+    def dispatch(self, payload: str):
+        try:
+            table, ids = decode_message(payload)
+        except ValueError:
+            logger.warning("ignoring malformed invalidation message %r", payload)
+            return
+        for handler in self._handlers:
+            handler(table, ids)
+
+    def reset(self):
+        for handler in self._reset_handlers:
+            handler()
+
+
+def evict_cached_rows(table: str, ids: list):
+    for cache in CACHES.values():
+        cache.invalidate_tag((table,))
+        for id in ids:
+            cache.invalidate_tag((table, id))
+
+
+def clear_caches():
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def evict_on_commit(session: AsyncSession, table: str, ids: Iterable):
+    """Evict this worker's entries for the rows once the session commits"""
+    session.info.setdefault(PENDING_EVICTIONS, {}).setdefault(table, set()).update(ids)
+
+
+def has_pending_evictions(session: AsyncSession, table: str) -> bool:
+    return table in session.info.get(PENDING_EVICTIONS, {})
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session: Session):
+    for table, ids in session.info.pop(PENDING_EVICTIONS, {}).items():
+        evict_cached_rows(table, list(ids))
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_rolled_back(session: Session, transaction):
+    # runs after after_commit; anything still pending was rolled back
+    if transaction.parent is None:
+        session.info.pop(PENDING_EVICTIONS, None)
+
+
+invalidation_bus = InvalidationBus()
+invalidation_bus.subscribe(evict_cached_rows, on_reset=clear_caches)
@@ -1,17 +1,32 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 
-from src.auth.dependencies import login_required
+from src.auth.dependencies import CurrentAdmin, login_required
 from src.auth.router import router as auth_router
+from src.cache import CACHES
 from src.cart.router import router as cart_router
+from src.config import settings_db
+from src.invalidation import PostgresTransport, invalidation_bus
+from src.orders.router import router as order_router
 from src.products.api.categories import router as category_router
 from src.products.api.products import router as product_router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await invalidation_bus.start(PostgresTransport(settings_db.ASYNCPG_DSN))
+    yield
+    await invalidation_bus.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(product_router, prefix="/products", tags=["products"])
 app.include_router(category_router, prefix="/categories", tags=["categories"])
 app.include_router(cart_router, prefix="/carts", tags=["carts"])
+app.include_router(order_router, prefix="/orders", tags=["orders"])
 
 
 @app.get("/")
@@ -20,5 +35,10 @@ async def home(current_user):
     return f"Hello {current_user.first_name}"
 
 
+@app.get("/cache/stats")
+async def cache_stats(current_admin: CurrentAdmin):
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8003)
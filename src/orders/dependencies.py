@@ -0,0 +1,49 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from src.cart.dependencies import get_cart_item_repository
+from src.cart.repository import CartItemRepository
+from src.db import AsyncSession, get_session
+from src.orders.repository import OrderItemRepository, OrderRepository
+from src.orders.service import OrderService
+from src.payments.repository import PaymentRepository
+from src.products.dependencies import get_product_repository
+from src.products.repository import ProductRepository
+
+
+async def get_order_repository(
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> OrderRepository:
+    return OrderRepository(session=session)
+
+
+async def get_order_item_repository(
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> OrderItemRepository:
+    return OrderItemRepository(session=session)
+
+
+async def get_payment_repository(
+    session: Annotated[AsyncSession, Depends(get_session)],
+) -> PaymentRepository:
+    return PaymentRepository(session=session)
+
+
+async def get_order_service(
+    order_repo: Annotated[OrderRepository, Depends(get_order_repository)],
+    order_item_repo: Annotated[OrderItemRepository, Depends(get_order_item_repository)],
+    cart_item_repo: Annotated[CartItemRepository, Depends(get_cart_item_repository)],
+    product_repo: Annotated[ProductRepository, Depends(get_product_repository)],
+    payment_repo: Annotated[PaymentRepository, Depends(get_payment_repository)],
+) -> OrderService:
+    return OrderService(
+        order_repo=order_repo,
+        order_item_repo=order_item_repo,
+        cart_item_repo=cart_item_repo,
+        product_repo=product_repo,
+        payment_repo=payment_repo,
+    )
+
+
+OrderServiceDep = Annotated[OrderService, Depends(get_order_service)]
@@ -0,0 +1,14 @@
+from fastapi import HTTPException, status
+
+
+class CheckoutConflictException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Checkout conflicted with concurrent orders, please retry",
+        )
+
+
+class OrderNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
@@ -1,7 +1,8 @@
 # src/orders/models.py
 from src.db import Base, CreatedAt, UpdatedAt
+from src.payments.models import Payment  # noqa: F401, mapped for Order.payment
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import UUID, ForeignKey, Integer, String, Enum as SQLEnum, CheckConstraint
+from sqlalchemy import UUID, ForeignKey, Index, Integer, String, Enum as SQLEnum, CheckConstraint
 from uuid import uuid4, UUID as UID
 from enum import Enum
 
@@ -18,7 +19,7 @@ class Order(Base):
     id: Mapped[UID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     user_id: Mapped[UID] = mapped_column(UUID(as_uuid=True),
                                           ForeignKey('users.id', ondelete="RESTRICT"),
-                                          nullable=False, index=True)
+                                          nullable=False)
     status: Mapped[OrderStatus] = mapped_column(SQLEnum(OrderStatus), 
                                                  default=OrderStatus.PENDING, 
                                                  nullable=False, index=True)
@@ -33,6 +34,10 @@ class Order(Base):
 
     __table_args__ = (
         CheckConstraint('total_amount >= 0', name='check_total_amount_positive'),
+        # keyset pagination of order history: GET /orders; INCLUDE makes it
+        # covering, so a page is an index-only scan
+        Index('ix_orders_user_created', 'user_id', 'created_at', 'id',
+              postgresql_include=['status', 'total_amount', 'updated_at']),
     )
 
 class OrderItem(Base):
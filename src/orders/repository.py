@@ -0,0 +1,45 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from src.orders.models import Order, OrderItem
+from src.utils import SqlAlchemyCRUDRepository, DEFAULT_PAGE_SIZE
+
+
+class OrderRepository(SqlAlchemyCRUDRepository):
+    model = Order
+
+    async def get_user_page(self, user_id, limit: int = DEFAULT_PAGE_SIZE, cursor: str | None = None):
+        """A user's orders, newest first, keyset paginated over (created_at, id).
+
+        Served by ix_orders_user_created; the items of the whole page come
+        from one extra SELECT ... WHERE order_id IN (...).
+        """
+        return await self.get_page(
+            self.model.user_id == user_id,
+            limit=limit,
+            cursor=cursor,
+            options=(selectinload(self.model.items),),
+        )
+
+    async def get_user_order(self, user_id, order_id):
+        query = (
+            select(self.model)
+            .options(selectinload(self.model.items))
+            .where(self.model.id == order_id, self.model.user_id == user_id)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
+
+class OrderItemRepository(SqlAlchemyCRUDRepository):
+    model = OrderItem
+
+    async def product_quantities(self, order_ids) -> dict:
+        """{product id: total quantity} over the given orders"""
+        query = (
+            select(self.model.product_id, func.sum(self.model.quantity))
+            .where(self.model.order_id.in_(order_ids))
+            .group_by(self.model.product_id)
+        )
+        result = await self.session.execute(query)
+        return dict(result.all())
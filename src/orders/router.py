@@ -0,0 +1,58 @@
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Query, Request, status
+
+from src.auth.dependencies import CurrentUser
+from src.idempotency.dependencies import IdempotencyKeyHeader, IdempotencyServiceDep
+from src.idempotency.service import SaveResponse
+from src.orders.dependencies import OrderServiceDep
+from src.orders.schemas import OrderOut, OrderPage
+from src.utils import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+
+@router.get("", response_model=OrderPage)
+async def get_orders(
+    service: OrderServiceDep,
+    current_user: CurrentUser,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """The current user's orders, newest first"""
+    return await service.get_orders_page(current_user.id, limit=limit, cursor=cursor)
+
+
+@router.get("/{order_id}", response_model=OrderOut)
+async def get_order(order_id: UUID, service: OrderServiceDep, current_user: CurrentUser):
+    return await service.get_order(current_user.id, order_id)
+
+
+@router.post("/checkout", response_model=OrderOut, status_code=status.HTTP_201_CREATED)
+async def checkout(
+    request: Request,
+    service: OrderServiceDep,
+    idempotency: IdempotencyServiceDep,
+    current_user: CurrentUser,
+    idempotency_key: IdempotencyKeyHeader = None,
+):
+    """Place an order for everything in the current user's cart.
+
+    Retries sent with the same Idempotency-Key get the first response back
+    instead of placing a second order.
+    """
+    async def place_order(save_response: SaveResponse) -> bytes:
+        body = b""
+
+        async def render(order: dict):
+            nonlocal body
+            body = OrderOut.model_validate(order).model_dump_json().encode()
+            await save_response(body)
+
+        await service.checkout(current_user.id, before_commit=render)
+        return body
+
+    return await idempotency.respond(
+        request, current_user.id, idempotency_key, place_order, status.HTTP_201_CREATED
+    )
@@ -0,0 +1,129 @@
+import asyncio
+import random
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from sqlalchemy.exc import DBAPIError
+
+from src.cart.exceptions import CartValidationException, EmptyCartException, InsufficientStockException
+from src.cart.repository import CartItemRepository
+from src.cart.service import checkout_errors
+from src.orders.exceptions import CheckoutConflictException, OrderNotFoundException
+from src.orders.models import OrderStatus
+from src.orders.repository import OrderItemRepository, OrderRepository
+from src.payments.repository import PaymentRepository
+from src.products.exception import InvalidCursorException
+from src.products.repository import ProductRepository
+
+CHECKOUT_ATTEMPTS = 5
+# upper bound of the first retry delay in seconds, doubled on every attempt
+CHECKOUT_BACKOFF = 0.02
+# serialization_failure, deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def is_retryable(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) in RETRYABLE_SQLSTATES
+
+
+class OrderService:
+    def __init__(
+        self,
+        order_repo: OrderRepository,
+        order_item_repo: OrderItemRepository,
+        cart_item_repo: CartItemRepository,
+        product_repo: ProductRepository,
+        payment_repo: PaymentRepository,
+    ):
+        self.order_repo = order_repo
+        self.order_item_repo = order_item_repo
+        self.cart_item_repo = cart_item_repo
+        self.product_repo = product_repo
+        self.payment_repo = payment_repo
+
+    async def get_orders_page(self, user_id: UUID, limit: int, cursor: str | None = None) -> dict:
+        try:
+            orders, next_cursor = await self.order_repo.get_user_page(user_id, limit=limit, cursor=cursor)
+        except ValueError:
+            raise InvalidCursorException
+        return {"items": orders, "next_cursor": next_cursor}
+
+    async def get_order(self, user_id: UUID, order_id: UUID):
+        """One of the user's orders; other users' orders are not found"""
+        order = await self.order_repo.get_user_order(user_id, order_id)
+        if order is None:
+            raise OrderNotFoundException
+        return order
+
+    async def checkout(
+        self, user_id: UUID, before_commit: Callable[[dict], Awaitable[None]] | None = None
+    ) -> dict:
+        """Turn the user's cart into an order, in one transaction.
+
+        `before_commit` gets the order inside that transaction, e.g. to store
+        the idempotent response with it. Deadlocks and serialization failures
+        roll back and retry after a random (full jitter) exponential backoff.
+        """
+        for attempt in range(CHECKOUT_ATTEMPTS):
+            try:
+                order = await self._place_order(user_id)
+                if before_commit is not None:
+                    await before_commit(order)
+                await self.order_repo.commit()
+                return order
+            except DBAPIError as exc:
+                await self.order_repo.rollback()
+                if not is_retryable(exc):
+                    raise
+            if attempt < CHECKOUT_ATTEMPTS - 1:
+                await asyncio.sleep(random.uniform(0, CHECKOUT_BACKOFF * 2 ** attempt))
+        raise CheckoutConflictException
+
+    async def _place_order(self, user_id: UUID) -> dict:
+        lines = await self.cart_item_repo.lock_checkout_lines(user_id)
+        if not lines:
+            raise EmptyCartException
+        errors = checkout_errors(lines)
+        if errors:
+            raise CartValidationException(errors)
+
+        total = sum(line["price_cents"] * line["quantity"] for line in lines)
+        order = await self.order_repo.create(
+            {
+                "user_id": user_id,
+                # nothing to charge, so a free order skips the payment worker
+                "status": OrderStatus.PENDING if total > 0 else OrderStatus.PROCESSING,
+                "total_amount": total,
+            }
+        )
+        items = await self.order_item_repo.create_many(
+            [
+                {
+                    "order_id": order.id,
+                    "product_id": line["product_id"],
+                    "quantity": line["quantity"],
+                    "product_name": line["name"],
+                    "product_price": line["price_cents"],
+                }
+                for line in lines
+            ]
+        )
+        taken = await self.product_repo.decrement_stock(
+            {line["product_id"]: line["quantity"] for line in lines}
+        )
+        if len(taken) != len(lines):
+            # the rows are locked, so only a bypassed lock gets here
+            raise InsufficientStockException
+        await self.cart_item_repo.delete_one_or_more(cart_id=lines[0]["cart_id"])
+        if total > 0:
+            # charged by the payment worker once this transaction commits
+            await self.payment_repo.create_pending(order.id, order.total_amount)
+
+        return {
+            "id": order.id,
+            "status": order.status,
+            "total_amount": order.total_amount,
+            "items": items,
+            "created_at": order.created_at,
+            "updated_at": order.updated_at,
+        }
@@ -1,7 +1,8 @@
 from src.db import Base, CreatedAt, UpdatedAt
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import UUID, ForeignKey, String, Enum as SQLEnum, CheckConstraint, Integer
+from sqlalchemy import UUID, Boolean, DateTime, ForeignKey, String, Enum as SQLEnum, CheckConstraint, Integer
 from uuid import uuid4, UUID as UID
+from datetime import datetime, timezone
 from enum import Enum
 
 class PaymentStatus(str, Enum):
@@ -31,4 +32,32 @@ class Payment(Base):
 
     __table_args__ = (
         CheckConstraint('amount > 0', name='check_payment_amount_positive'),
-    )
\ No newline at end of file
+    )
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PaymentOutbox(Base):
+    """A payment waiting to be sent to the provider.
+
+    Written in the checkout transaction and deleted once the payment is
+    settled. A worker claiming a row pushes available_at past its lease, a
+    failed attempt pushes it to the next retry. A row still failing after
+    its last attempt is kept for reconciliation and never claimed again: the
+    charge may have been captured, so its order is left as it is.
+    """
+
+    __tablename__ = "payment_outbox"
+
+    id: Mapped[UID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    payment_id: Mapped[UID] = mapped_column(UUID(as_uuid=True),
+                                             ForeignKey('payments.id', ondelete="CASCADE"),
+                                             unique=True, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow,
+                                                   nullable=False, index=True)
+    last_error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    needs_reconciliation: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+    created_at: Mapped[CreatedAt]
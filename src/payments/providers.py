@@ -0,0 +1,61 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+
+
+@dataclass(frozen=True)
+class ChargeRequest:
+    # also the idempotency key at the provider: a payment re-claimed after a
+    # crashed attempt must not be charged twice
+    payment_id: UUID
+    amount: int  # in cents
+    currency: str
+
+
+@dataclass(frozen=True)
+class ChargeResult:
+    succeeded: bool
+    charge_id: str | None = None
+    error: str | None = None
+
+
+class PaymentProvider(ABC):
+    """A card processor.
+
+    charge returns a result for a definite answer (captured or declined)
+    and raises for anything worth retrying: timeouts, 5xx, rate limits.
+    """
+
+    @abstractmethod
+    async def charge(self, request: ChargeRequest) -> ChargeResult:
+        raise NotImplementedError
+
+
+class FakePaymentProvider(PaymentProvider):
+    """In-process provider for tests and local development.
+
+    Charges succeed unless the amount is listed in `decline_amounts`
+    (declined) or `error_amounts` (raises, like a timeout). Repeated
+    charges of one payment return the first result, as a real provider
+    honouring idempotency keys would.
+    """
+
+    def __init__(self, decline_amounts=(), error_amounts=()):
+        self.decline_amounts = set(decline_amounts)
+        self.error_amounts = set(error_amounts)
+        self.charges: dict[UUID, ChargeResult] = {}
+
+    async def charge(self, request: ChargeRequest) -> ChargeResult:
+        if request.payment_id in self.charges:
+            return self.charges[request.payment_id]
+        if request.amount in self.error_amounts:
+            raise ConnectionError("payment provider unavailable")
+        if request.amount in self.decline_amounts:
+            result = ChargeResult(succeeded=False, error="card declined")
+        else:
+            result = ChargeResult(succeeded=True, charge_id=f"ch_{uuid4().hex}")
+        self.charges[request.payment_id] = result
+        return result
+
+
+PROVIDERS = {"fake": FakePaymentProvider}
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import select, update
+
+from src.payments.models import Payment, PaymentOutbox
+from src.utils import SqlAlchemyCRUDRepository
+
+
+class PaymentRepository(SqlAlchemyCRUDRepository):
+    model = Payment
+
+    async def create_pending(self, order_id, amount: int) -> Payment:
+        """A pending payment and its outbox row, in the caller's transaction"""
+        payment = Payment(id=uuid4(), order_id=order_id, amount=amount)
+        self.session.add_all([payment, PaymentOutbox(payment_id=payment.id)])
+        await self.session.flush()
+        return payment
+
+
+class PaymentOutboxRepository(SqlAlchemyCRUDRepository):
+    model = PaymentOutbox
+
+    async def claim(self, now: datetime, lease: timedelta, limit: int) -> list:
+        """Take up to `limit` due payments for this worker.
+
+        FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint
+        batches without waiting on each other. Pushing available_at past
+        the lease hides the rows until then, so the claim can commit before
+        the provider is called. Returns the outbox rows joined to their
+        payments.
+        """
+        table = self.model.__table__
+        due = (
+            select(table.c.id)
+            .where(table.c.available_at <= now)
+            .where(table.c.needs_reconciliation.is_(False))
+            .order_by(table.c.available_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(table)
+            .where(table.c.id.in_(due))
+            .values(available_at=now + lease, attempts=table.c.attempts + 1)
+            .returning(table.c.id)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            return []
+
+        query = (
+            select(
+                table.c.id,
+                table.c.attempts,
+                table.c.payment_id,
+                Payment.order_id,
+                Payment.amount,
+                Payment.currency,
+            )
+            .join(Payment, Payment.id == table.c.payment_id)
+            .where(table.c.id.in_(ids))
+        )
+        result = await self.session.execute(query)
+        return result.mappings().all()
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from src.orders.models import OrderStatus
+from src.orders.repository import OrderItemRepository, OrderRepository
+from src.payments.models import PaymentStatus
+from src.payments.providers import ChargeRequest, PaymentProvider
+from src.payments.repository import PaymentOutboxRepository, PaymentRepository
+from src.products.repository import ProductRepository
+
+PAYMENT_BATCH_SIZE = 50
+# a claimed payment is hidden from other workers for this long
+PAYMENT_LEASE = timedelta(minutes=5)
+PAYMENT_MAX_ATTEMPTS = 5
+# delay before the first retry, doubled on every attempt
+PAYMENT_RETRY_DELAY = timedelta(seconds=30)
+
+
+class PaymentService:
+    def __init__(
+        self,
+        outbox_repo: PaymentOutboxRepository,
+        payment_repo: PaymentRepository,
+        order_repo: OrderRepository,
+        order_item_repo: OrderItemRepository,
+        product_repo: ProductRepository,
+        provider: PaymentProvider,
+    ):
+        self.outbox_repo = outbox_repo
+        self.payment_repo = payment_repo
+        self.order_repo = order_repo
+        self.order_item_repo = order_item_repo
+        self.product_repo = product_repo
+        self.provider = provider
+
+    async def process_batch(self, batch_size: int | None = None) -> int:
+        """Charge one batch of due payments; returns how many were claimed.
+
+        The claim commits before the provider is called, so no transaction
+        or pooled connection is held across its latency. Results are
+        written back with one bulk statement per table:
+
+        - captured: payment completed, order processing;
+        - declined: payment failed, order cancelled and its stock put back;
+        - provider error: retried later with exponential backoff. After the
+          last attempt the outbox row is flagged for reconciliation and the
+          payment and order are left pending, since an error (e.g. a
+          timeout) does not tell whether the charge was captured.
+        """
+        batch_size = batch_size or PAYMENT_BATCH_SIZE
+        now = datetime.now(timezone.utc)
+        claimed = await self.outbox_repo.claim(now, PAYMENT_LEASE, batch_size)
+        await self.outbox_repo.commit()
+        if not claimed:
+            return 0
+
+        results = await asyncio.gather(
+            *(
+                self.provider.charge(ChargeRequest(row["payment_id"], row["amount"], row["currency"]))
+                for row in claimed
+            ),
+            return_exceptions=True,
+        )
+
+        payments, orders, settled, retries = [], [], [], []
+        cancelled_orders = []
+        for row, result in zip(claimed, results):
+            if isinstance(result, Exception):
+                retry = {"id": row["id"], "last_error": repr(result)[:500]}
+                if row["attempts"] < PAYMENT_MAX_ATTEMPTS:
+                    retry["available_at"] = now + PAYMENT_RETRY_DELAY * 2 ** (row["attempts"] - 1)
+                else:
+                    retry["needs_reconciliation"] = True
+                retries.append(retry)
+                continue
+
+            succeeded, charge_id = result.succeeded, result.charge_id
+
+            payments.append(
+                {
+                    "id": row["payment_id"],
+                    "status": PaymentStatus.COMPLETED if succeeded else PaymentStatus.FAILED,
+                    "stripe_charge_id": charge_id,
+                }
+            )
+            orders.append(
+                {
+                    "id": row["order_id"],
+                    "status": OrderStatus.PROCESSING if succeeded else OrderStatus.CANCELLED,
+                }
+            )
+            if not succeeded:
+                cancelled_orders.append(row["order_id"])
+            settled.append(row["id"])
+
+        await self.payment_repo.update_many(payments)
+        await self.order_repo.update_many(orders)
+        if cancelled_orders:
+            await self.product_repo.restock(await self.order_item_repo.product_quantities(cancelled_orders))
+        await self.outbox_repo.delete_many(settled)
+        await self.outbox_repo.update_many(retries)
+        await self.outbox_repo.commit()
+        return len(claimed)
@@ -0,0 +1,72 @@
+"""Payment processing worker.
+
+    python -m src.payments.worker
+    python -m src.payments.worker --batch-size 100 --interval 2
+    python -m src.payments.worker --once
+
+Any number of workers can run side by side: each claims its own batch
+from the payment outbox.
+"""
+import argparse
+import asyncio
+import logging
+
+from src.config import settings_db
+from src.db import async_session_maker
+from src.invalidation import PostgresTransport, invalidation_bus
+from src.orders.repository import OrderItemRepository, OrderRepository
+from src.payments.providers import PROVIDERS, PaymentProvider
+from src.payments.repository import PaymentOutboxRepository, PaymentRepository
+from src.payments.service import PAYMENT_BATCH_SIZE, PaymentService
+from src.products.repository import ProductRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def process_batch(provider: PaymentProvider, batch_size: int) -> int:
+    async with async_session_maker() as session:
+        service = PaymentService(
+            outbox_repo=PaymentOutboxRepository(session=session),
+            payment_repo=PaymentRepository(session=session),
+            order_repo=OrderRepository(session=session),
+            order_item_repo=OrderItemRepository(session=session),
+            product_repo=ProductRepository(session=session),
+            provider=provider,
+        )
+        return await service.process_batch(batch_size)
+
+
+async def run(provider: PaymentProvider, batch_size: int, interval: float, once: bool = False):
+    # restocked products are evicted from the API workers' caches through NOTIFY
+    await invalidation_bus.start(PostgresTransport(settings_db.ASYNCPG_DSN))
+    try:
+        while True:
+            try:
+                claimed = await process_batch(provider, batch_size)
+            except Exception:
+                logger.exception("payment batch failed")
+                claimed = 0
+            if once:
+                return
+            # a full batch means more are probably due: go again at once
+            if claimed < batch_size:
+                await asyncio.sleep(interval)
+    finally:
+        await invalidation_bus.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.payments.worker")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="fake")
+    parser.add_argument("--batch-size", type=int, default=PAYMENT_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between polls when idle")
+    parser.add_argument("--once", action="store_true", help="process one batch and exit")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(PROVIDERS[args.provider](), args.batch_size, args.interval, once=args.once))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,19 +1,37 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, status
 
 from src.products.dependencies import CategoryServiceDep
-from src.products.schemas import CategoryIn, CategoryOut, CategoryUpdate
+from src.products.service import MAX_SUGGEST_LIMIT, SUGGEST_LIMIT
+from src.products.schemas import CategoryIn, CategoryOut, CategoryPage, CategoryUpdate, SuggestionOut
+from src.responses import json_response
+from src.utils import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
+from typing import Annotated
 from uuid import UUID
 
 router = APIRouter()
 
-@router.get("", response_model=list[CategoryOut])
-async def get_categories(service: CategoryServiceDep):
-    return await service.get_all()
+@router.get("", response_model=CategoryPage)
+async def get_categories(
+    request: Request,
+    service: CategoryServiceDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    body, etag = await service.get_page_json(CategoryPage, limit=limit, cursor=cursor)
+    return json_response(request, body, etag)
+
+@router.get("/suggest", response_model=list[SuggestionOut])
+async def suggest_categories(
+    service: CategoryServiceDep,
+    prefix: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SUGGEST_LIMIT)] = SUGGEST_LIMIT,
+):
+    return await service.suggest(prefix, limit=limit)
 
 @router.get("/{category_id}", response_model=CategoryOut)
 async def get_category(category_id: UUID, service: CategoryServiceDep):
-    return await service.get_objects(id=category_id)
+    return await service.get_object(category_id)
     
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=CategoryOut)
 async def create_category(new_category: CategoryIn, service: CategoryServiceDep):
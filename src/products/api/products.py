@@ -1,24 +1,107 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from src.auth.dependencies import CurrentAdmin
 
 from src.products.dependencies import ProductServiceDep
-from src.products.schemas import ProductIn, ProductOut, ProductUpdate
+from src.products.exception import InvalidImportFileException
+from src.products.importer import is_decodable, read_rows
+from src.products.service import MAX_SUGGEST_LIMIT, SUGGEST_LIMIT
+from src.products.schemas import (
+    CatalogFormat,
+    ImportReport,
+    ProductBulkUpdate,
+    ProductBulkUpdateResult,
+    ProductFacets,
+    ProductFilter,
+    ProductIn,
+    ProductListParams,
+    ProductOut,
+    ProductPage,
+    ProductSearchPage,
+    ProductUpdate,
+    SuggestionOut,
+)
+from src.responses import json_response
+from src.utils import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
+import io
+from typing import Annotated
 from uuid import UUID
 
 router = APIRouter()
 
-@router.get("", response_model=list[ProductOut])
-async def get_products(service: ProductServiceDep):
-    return await service.get_all()
+@router.get("", response_model=ProductPage)
+async def get_products(service: ProductServiceDep, params: Annotated[ProductListParams, Query()]):
+    return await service.get_filtered_page(
+        params.filters(), sort=params.sort.value, limit=params.limit, cursor=params.cursor
+    )
+
+@router.get("/export")
+async def export_products(
+    service: ProductServiceDep,
+    current_admin: CurrentAdmin,
+    format: CatalogFormat = CatalogFormat.NDJSON,
+):
+    media_type = "text/csv" if format == CatalogFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_catalog(format.value),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format.value}"'},
+    )
+
+@router.post("/import", response_model=ImportReport)
+async def import_products(
+    service: ProductServiceDep,
+    current_admin: CurrentAdmin,
+    file: UploadFile,
+    format: CatalogFormat = CatalogFormat.NDJSON,
+):
+    # batches commit as they go, so the encoding is checked before the first
+    # one: a decode error partway through would leave the file half imported
+    if not is_decodable(file.file, "utf-8-sig"):
+        raise InvalidImportFileException
+    # the upload is spooled to a temporary file; parse it lazily from there
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return await service.import_products(read_rows(stream, format.value))
+    finally:
+        stream.detach()
+
+@router.get("/facets", response_model=ProductFacets)
+async def get_product_facets(service: ProductServiceDep, filters: Annotated[ProductFilter, Query()]):
+    return await service.get_facets(filters.model_dump())
+
+@router.get("/search", response_model=ProductSearchPage)
+async def search_products(
+    service: ProductServiceDep,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0)] = 0,
+):
+    return await service.search(q, limit=limit, offset=offset)
+
+@router.get("/suggest", response_model=list[SuggestionOut])
+async def suggest_products(
+    service: ProductServiceDep,
+    prefix: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=MAX_SUGGEST_LIMIT)] = SUGGEST_LIMIT,
+):
+    return await service.suggest(prefix, limit=limit)
 
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: UUID, service: ProductServiceDep):
-    return await service.get_objects(id=product_id)
+async def get_product(product_id: UUID, request: Request, service: ProductServiceDep):
+    body, etag = await service.get_object_json(ProductOut, product_id)
+    return json_response(request, body, etag)
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=ProductOut)
 async def create_product(new_product: ProductIn, service: ProductServiceDep):
     return await service.create_object(new_product.model_dump())
 
+@router.patch("/bulk", response_model=ProductBulkUpdateResult)
+async def bulk_update_products(changes: ProductBulkUpdate, service: ProductServiceDep, current_admin: CurrentAdmin):
+    return await service.bulk_update([item.model_dump() for item in changes.items])
+
 @router.put("/{product_id}", response_model=ProductOut)
 async def update_product(product_id: UUID, new_data: ProductUpdate, service: ProductServiceDep):
     return await service.update_objects(new_data.model_dump(),id=product_id)
@@ -0,0 +1,50 @@
+"""Catalog maintenance commands.
+
+    python -m src.products.cli import products.csv
+    python -m src.products.cli import products.ndjson --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from src.config import settings_db
+from src.db import async_session_maker
+from src.invalidation import PostgresTransport, invalidation_bus
+from src.products.importer import read_rows
+from src.products.repository import ProductRepository
+from src.products.service import IMPORT_BATCH_SIZE, ProductService
+
+
+async def import_file(path: Path, format: str, batch_size: int) -> dict:
+    # running API workers evict the rows we overwrite through NOTIFY
+    await invalidation_bus.start(PostgresTransport(settings_db.ASYNCPG_DSN))
+    try:
+        async with async_session_maker() as session:
+            service = ProductService(ProductRepository(session=session))
+            with path.open(encoding="utf-8-sig", newline="") as stream:
+                return await service.import_products(read_rows(stream, format), batch_size=batch_size)
+    finally:
+        await invalidation_bus.stop()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.products.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="bulk insert or update products from a file")
+    import_parser.add_argument("path", type=Path)
+    import_parser.add_argument(
+        "--format", choices=("csv", "ndjson"), help="defaults to the file extension"
+    )
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    args = parser.parse_args(argv)
+    format = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+    report = asyncio.run(import_file(args.path, format, args.batch_size))
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
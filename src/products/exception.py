@@ -6,4 +6,12 @@ class ObjectNotFoundException(HTTPException):
 
 class ObjectExistsException(HTTPException):
     def __init__(self):
-        super().__init__(status_code=400, detail="Object already exists")
\ No newline at end of file
+        super().__init__(status_code=400, detail="Object already exists")
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid pagination cursor")
+
+class InvalidImportFileException(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=400, detail="Import file must be UTF-8 encoded text")
@@ -0,0 +1,63 @@
+import codecs
+import csv
+import json
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+# (row number, parsed fields or None, parse error or None)
+ImportRecord = tuple[int, dict | None, str | None]
+
+
+def read_rows(stream: TextIO, format: str) -> Iterator[ImportRecord]:
+    """Lazily parse a CSV (with header) or NDJSON catalog, one record at a time.
+
+    Rows are numbered from 1, not counting the CSV header. Empty CSV cells
+    become None so optional fields can be left blank.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row, record in enumerate(reader, start=1):
+            if None in record:
+                yield row, None, "too many fields"
+                continue
+            yield row, {name: value or None for name, value in record.items()}, None
+        return
+
+    row = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "expected a JSON object"
+            continue
+        yield row, record, None
+
+
+def is_decodable(file: BinaryIO, encoding: str, chunk_size: int = 1 << 16) -> bool:
+    """Whether the whole file decodes, read chunk by chunk; rewinds the file"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        while chunk := file.read(chunk_size):
+            decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        file.seek(0)
+    return True
+
+
+def batched(records: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -7,11 +7,15 @@ from sqlalchemy import (
     Boolean,
     CheckConstraint,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     event,
+    literal_column,
+    text,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db import Base, CreatedAt, UpdatedAt
@@ -37,6 +41,18 @@ class Category(Base):
         back_populates="category", passive_deletes=False
     )
 
+    __table_args__ = (
+        # keyset pagination: GET /categories
+        Index("ix_categories_created_at_id", "created_at", "id"),
+        # typeahead: GET /categories/suggest
+        Index(
+            "ix_categories_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
 
 class Product(Base):
     __tablename__ = "products"
@@ -64,9 +80,44 @@ class Product(Base):
     __table_args__ = (
         CheckConstraint("price_cents >= 0", name="check_price_cents_positive"),
         CheckConstraint("stock >=0", name="check_stock_non_negative"),
+        # keyset pagination and filtered listing: GET /products
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_price_cents_id", "price_cents", "id"),
+        Index("ix_products_name_id", "name", "id"),
+        Index(
+            "ix_products_category_active_price",
+            "category_id", "is_active", "price_cents", "id",
+        ),
+        Index(
+            "ix_products_category_active_created",
+            "category_id", "is_active", "created_at", "id",
+        ),
+        Index(
+            "ix_products_in_stock_created",
+            "created_at", "id",
+            postgresql_where=text("is_active AND stock > 0"),
+        ),
+        Index(
+            "ix_products_in_stock_price",
+            "price_cents", "id",
+            postgresql_where=text("is_active AND stock > 0"),
+        ),
+        # typeahead: GET /products/suggest
+        Index(
+            "ix_products_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
     )
 
 
+# Generated full-text column (name weighted over description) with a GIN index,
+# created by migration. It's left unmapped so the ORM never loads it and
+# metadata.create_all keeps working on databases without tsvector support.
+product_search_vector = literal_column("products.search_vector", type_=TSVECTOR)
+
+
 @event.listens_for(Category, "before_insert")
 @event.listens_for(Category, "before_update")
 def generate_category_slug_category(mapper, connection, target):
@@ -1,8 +1,259 @@
-from src.products.models import Product, Category
-from src.utils import SqlAlchemyCRUDRepository
+from sqlalchemy import (
+    Boolean, Integer, Uuid, case, cast, column, func, literal, literal_column, or_, select, tuple_,
+    update, values,
+)
+from sqlalchemy.orm import load_only
 
-class CategoryRepository(SqlAlchemyCRUDRepository):
+from src.cache import LRUCache
+from src.products.models import Product, Category, product_search_vector, slugify
+from src.utils import SqlAlchemyCRUDRepository, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+SEARCH_CONFIG = "english"
+
+# fields a bulk inventory update may change, with their SQL types
+BULK_UPDATE_FIELDS = {"price_cents": Integer, "stock": Integer, "is_active": Boolean}
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+# lower bounds of the price histogram buckets, in cents
+PRICE_BUCKETS = (0, 1000, 2500, 5000, 10000, 25000, 50000)
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class NameSuggestMixin:
+    suggest_filter = ()
+
+    async def suggest(self, prefix: str, limit: int):
+        """Top names and slugs for a typeahead prefix.
+
+        Prefix matches and typo-tolerant trigram matches are both served by
+        the gin_trgm_ops index on name.
+        """
+        name = self.model.name
+        query = (
+            select(name, self.model.slug)
+            .filter(*self.suggest_filter)
+            .where(or_(
+                name.ilike(escape_like(prefix) + "%", escape="\\"),
+                literal(prefix).bool_op("<%")(name),
+            ))
+            .order_by(func.word_similarity(prefix, name).desc(), name)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+
+class SlugMixin:
+    """Keeps slug in sync with name on statement-based writes, like the
+    before_insert/before_update listeners do for ORM flushes"""
+
+    def _prepare_values(self, data: dict) -> dict:
+        values = super()._prepare_values(data)
+        if "name" in values:
+            values["slug"] = slugify(values["name"])
+        return values
+
+class CategoryRepository(SlugMixin, NameSuggestMixin, SqlAlchemyCRUDRepository):
     model = Category
+    write_mode = "core"
+    cache = LRUCache(maxsize=1024, ttl=300, name="categories")
+    cache_fields = ("id", "slug")
 
-class ProductRepository(SqlAlchemyCRUDRepository):
+class ProductRepository(SlugMixin, NameSuggestMixin, SqlAlchemyCRUDRepository):
     model = Product
+    write_mode = "core"
+    cache = LRUCache(maxsize=10_000, ttl=300, name="products")
+    cache_fields = ("id", "slug")
+    suggest_filter = (Product.is_active.is_(True),)
+    # everything a listing shows; the unbounded description is left out
+    listing_columns = (
+        Product.id, Product.name, Product.slug, Product.price_cents, Product.stock,
+        Product.is_active, Product.category_id, Product.created_at, Product.updated_at,
+    )
+    sort_columns = {
+        "created_at": Product.created_at,
+        "price": Product.price_cents,
+        "name": Product.name,
+    }
+
+    def filter_conditions(
+        self,
+        category_id=None,
+        min_price_cents: int | None = None,
+        max_price_cents: int | None = None,
+        is_active: bool | None = None,
+        in_stock: bool | None = None,
+    ) -> list:
+        """Translate listing filters into WHERE clauses.
+
+        Comparisons are written so they match the predicates of the composite
+        and partial indexes declared on Product.
+        """
+        conditions = []
+        if category_id is not None:
+            conditions.append(self.model.category_id == category_id)
+        if is_active is not None:
+            conditions.append(self.model.is_active == is_active)
+        if min_price_cents is not None:
+            conditions.append(self.model.price_cents >= min_price_cents)
+        if max_price_cents is not None:
+            conditions.append(self.model.price_cents <= max_price_cents)
+        if in_stock is True:
+            conditions.append(self.model.stock > 0)
+        elif in_stock is False:
+            conditions.append(self.model.stock == 0)
+        return conditions
+
+    async def get_filtered_page(
+        self,
+        filters: dict,
+        sort: str = "-created_at",
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ):
+        descending = sort.startswith("-")
+        order_by = self.sort_columns[sort.lstrip("-")]
+        return await self.get_page(
+            *self.filter_conditions(**filters),
+            limit=limit,
+            cursor=cursor,
+            order_by=order_by,
+            descending=descending,
+            options=(load_only(*self.listing_columns, raiseload=True),),
+        )
+
+    async def search(self, text: str, limit: int, offset: int = 0):
+        """Rank active products matching a web-style search query.
+
+        Returns the page and the offset of the next one (None on the last page).
+        """
+        limit = min(limit, MAX_PAGE_SIZE)
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        rank = func.ts_rank_cd(product_search_vector, ts_query)
+
+        query = (
+            select(self.model)
+            .where(self.model.is_active.is_(True))
+            .where(product_search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), self.model.id)
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        result = await self.session.execute(query)
+        objects = result.scalars().all()
+        if len(objects) <= limit:
+            return objects, None
+        return objects[:limit], offset + limit
+
+    async def facets(self, filters: dict):
+        """Category counts, price histogram and totals for a filter in one query.
+
+        Rows come from GROUPING SETS ((category_id), (price_bucket), ()); the
+        grouping_id column tells them apart: 1 = per category, 2 = per price
+        bucket, 3 = grand total.
+        """
+        # bucket bounds are inlined so the SELECT and GROUP BY expressions are
+        # textually identical
+        bucket = case(
+            *(
+                (self.model.price_cents < literal_column(str(upper)), literal_column(str(lower)))
+                for lower, upper in zip(PRICE_BUCKETS, PRICE_BUCKETS[1:])
+            ),
+            else_=literal_column(str(PRICE_BUCKETS[-1])),
+        )
+        query = (
+            select(
+                self.model.category_id,
+                bucket.label("price_bucket"),
+                func.count().label("count"),
+                func.count().filter(self.model.stock > 0).label("in_stock"),
+                func.grouping(self.model.category_id, bucket).label("grouping_id"),
+            )
+            .filter(*self.filter_conditions(**filters))
+            .group_by(func.grouping_sets(
+                tuple_(self.model.category_id), tuple_(bucket), tuple_()
+            ))
+        )
+        result = await self.session.execute(query)
+        return result.mappings().all()
+
+    async def get_stock_levels(self, ids) -> dict:
+        """{id: row(is_active, stock, name)} for the given products, in one query"""
+        query = select(
+            self.model.id, self.model.name, self.model.is_active, self.model.stock
+        ).where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+        return {row.id: row for row in result.all()}
+
+    async def decrement_stock(self, quantities: dict) -> list:
+        """Take {product id: quantity} out of stock with one UPDATE.
+
+        Rows without enough stock are left untouched; returns the ids that
+        were decremented.
+        """
+        return await self._change_stock(quantities, decrement=True)
+
+    async def restock(self, quantities: dict) -> list:
+        """Put {product id: quantity} back into stock with one UPDATE"""
+        return await self._change_stock(quantities, decrement=False)
+
+    async def _change_stock(self, quantities: dict, decrement: bool) -> list:
+        if not quantities:
+            return []
+        table = self.model.__table__
+        changes = values(
+            column("id", Uuid), column("quantity", Integer), name="changes"
+        ).data(list(quantities.items())).cte("changes")
+        stmt = update(table).where(table.c.id == changes.c.id)
+        if decrement:
+            stmt = stmt.where(table.c.stock >= changes.c.quantity)
+            stock = table.c.stock - changes.c.quantity
+        else:
+            stock = table.c.stock + changes.c.quantity
+        stmt = stmt.values(stock=stock, updated_at=func.now()).returning(table.c.id)
+        ids = (await self.session.execute(stmt)).scalars().all()
+        await self._written(ids)
+        return ids
+
+    async def existing_category_ids(self, ids) -> set:
+        result = await self.session.execute(select(Category.id).where(Category.id.in_(ids)))
+        return set(result.scalars().all())
+
+    async def bulk_update(self, changes: list[dict], chunk_size: int | None = None) -> list:
+        """Apply per-product price/stock/is_active changes.
+
+        Each chunk is a single UPDATE joined to an inline VALUES list; fields
+        left None keep their current value. Returns the new inventory columns
+        of the updated rows; unknown ids are skipped.
+        """
+        chunk_size = chunk_size or BULK_UPDATE_CHUNK_SIZE
+        table = self.model.__table__
+        updated = []
+        for start in range(0, len(changes), chunk_size):
+            chunk = changes[start:start + chunk_size]
+            rows = values(
+                column("id", Uuid),
+                *(column(name, type_) for name, type_ in BULK_UPDATE_FIELDS.items()),
+                name="changes",
+            ).data([
+                (change["id"], *(change.get(name) for name in BULK_UPDATE_FIELDS))
+                for change in chunk
+            ]).cte("changes")
+            stmt = (
+                update(table)
+                .where(table.c.id == rows.c.id)
+                .values(
+                    {
+                        # the cast types columns a chunk leaves entirely NULL
+                        name: func.coalesce(cast(rows.c[name], type_), table.c[name])
+                        for name, type_ in BULK_UPDATE_FIELDS.items()
+                    }
+                    | {"updated_at": func.now()}
+                )
+                .returning(table.c.id, *(table.c[name] for name in BULK_UPDATE_FIELDS), table.c.updated_at)
+            )
+            result = await self.session.execute(stmt)
+            updated.extend(result.mappings().all())
+
+        await self._written([row["id"] for row in updated])
+        return updated
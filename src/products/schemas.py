@@ -1,9 +1,14 @@
-from pydantic import BaseModel, UUID4, Field
+from pydantic import BaseModel, UUID4, Field, model_validator
 from uuid import UUID
+from enum import Enum
 
 from typing import Optional
 from datetime import datetime
 
+from src.utils import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_BULK_UPDATE_ITEMS = 10_000
+
 class CategoryIn(BaseModel):
     name: str = Field(min_length=1, max_length=130)
 
@@ -17,6 +22,14 @@ class CategoryOut(CategoryIn):
     created_at: datetime
     updated_at: datetime
 
+class SuggestionOut(BaseModel):
+    name: str
+    slug: str
+
+class CategoryPage(BaseModel):
+    items: list[CategoryOut]
+    next_cursor: Optional[str] = None
+
 class ProductIn(BaseModel):
     name: str = Field(min_length=1, max_length=130)
     description: Optional[str | None] = None
@@ -36,3 +49,114 @@ class ProductOut(ProductIn):
 
     created_at: datetime
     updated_at: datetime
+
+class ProductInventoryUpdate(BaseModel):
+    id: UUID
+    price_cents: Optional[int] = Field(default=None, ge=0)
+    stock: Optional[int] = Field(default=None, ge=0)
+    is_active: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        if self.price_cents is None and self.stock is None and self.is_active is None:
+            raise ValueError("at least one of price_cents, stock or is_active is required")
+        return self
+
+class ProductBulkUpdate(BaseModel):
+    items: list[ProductInventoryUpdate] = Field(min_length=1, max_length=MAX_BULK_UPDATE_ITEMS)
+
+    @model_validator(mode="after")
+    def check_unique_ids(self):
+        if len({item.id for item in self.items}) != len(self.items):
+            raise ValueError("each product id may appear only once")
+        return self
+
+class ProductInventoryOut(BaseModel):
+    id: UUID
+    price_cents: int
+    stock: int
+    is_active: bool
+    updated_at: datetime
+
+class ProductBulkUpdateResult(BaseModel):
+    updated: list[ProductInventoryOut]
+    missing: list[UUID]
+
+class ProductListOut(BaseModel):
+    """ProductOut without the description, for listings"""
+    id: UUID
+    name: str
+    slug: str
+    price_cents: int
+    stock: int
+    is_active: bool
+    category_id: UUID
+
+    created_at: datetime
+    updated_at: datetime
+
+class ProductPage(BaseModel):
+    items: list[ProductListOut]
+    next_cursor: Optional[str] = None
+
+class ProductSearchPage(BaseModel):
+    items: list[ProductOut]
+    next_offset: Optional[int] = None
+
+class ProductSort(str, Enum):
+    NEWEST = "-created_at"
+    OLDEST = "created_at"
+    PRICE_ASC = "price"
+    PRICE_DESC = "-price"
+    NAME_ASC = "name"
+    NAME_DESC = "-name"
+
+class ProductFilter(BaseModel):
+    category_id: Optional[UUID] = None
+    min_price_cents: Optional[int] = Field(default=None, ge=0)
+    max_price_cents: Optional[int] = Field(default=None, ge=0)
+    is_active: Optional[bool] = None
+    in_stock: Optional[bool] = None
+
+    @model_validator(mode="after")
+    def check_price_range(self):
+        if (self.min_price_cents is not None and self.max_price_cents is not None
+                and self.min_price_cents > self.max_price_cents):
+            raise ValueError("min_price_cents must not exceed max_price_cents")
+        return self
+
+class ProductListParams(ProductFilter):
+    sort: ProductSort = ProductSort.NEWEST
+    limit: int = Field(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    cursor: Optional[str] = None
+
+    def filters(self) -> dict:
+        return self.model_dump(include=set(ProductFilter.model_fields))
+
+class CategoryFacet(BaseModel):
+    category_id: UUID
+    count: int
+
+class PriceBucketFacet(BaseModel):
+    min_price_cents: int
+    max_price_cents: Optional[int] = None
+    count: int
+
+class ProductFacets(BaseModel):
+    total: int
+    in_stock: int
+    categories: list[CategoryFacet]
+    price_buckets: list[PriceBucketFacet]
+
+class CatalogFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: list[ImportRowError]
@@ -1,9 +1,51 @@
+from src.cache import LRUCache
+from src.products.repository import PRICE_BUCKETS
+from src.responses import make_etag
 from src.utils import CRUDRepository
 from src.db import Base
-from src.products.exception import ObjectNotFoundException, ObjectExistsException
+from src.products.exception import ObjectNotFoundException, ObjectExistsException, InvalidCursorException
+from src.products.importer import ImportRecord, batched
+from src.products.models import slugify
+from src.products.schemas import ProductIn
 
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.exc import IntegrityError
 
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 25
+
+EXPORT_COLUMNS = (
+    "id", "name", "slug", "description", "price_cents", "stock",
+    "is_active", "category_id", "created_at", "updated_at",
+)
+EXPORT_BATCH_SIZE = 1000
+IMPORT_BATCH_SIZE = 1000
+# columns an import overwrites when the slug already exists
+IMPORT_UPDATE_FIELDS = ("name", "description", "price_cents", "stock", "is_active", "category_id")
+
+def export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    return str(value)
+
+# encoded JSON bodies of hot read endpoints, tagged like repository entries so
+# row writes evict them
+response_cache = LRUCache(maxsize=10_000, ttl=300, name="responses")
+
+def validation_messages(exc: ValidationError) -> list[str]:
+    return [
+        f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+        for error in exc.errors(include_url=False)
+    ]
+
 def check_objects(objects: list):
     if not objects:
             raise ObjectNotFoundException
@@ -13,35 +55,218 @@ def check_objects(objects: list):
         return objects[0]
 
 class CRUDService:
+    # typeahead results keyed by normalized prefix, shared by all requests of
+    # the process; tagged with the table so any committed write evicts them
+    suggest_cache: LRUCache | None = None
+
     def __init__(self, repository: CRUDRepository):
         self.repository = repository
 
     async def create_object(self, data: dict) -> Base:
         try:
             object = await self.repository.create(data=data)
+            await self.repository.commit()
         except IntegrityError:
+            await self.repository.rollback()
             raise ObjectExistsException
         return object
     
     async def get_all(self) -> list[Base]:
         objects = await self.repository.get_all()
         return objects
+
+    async def get_page(self, limit: int, cursor: str | None = None) -> dict:
+        try:
+            objects, next_cursor = await self.repository.get_page(limit=limit, cursor=cursor)
+        except ValueError:
+            raise InvalidCursorException
+        return {"items": objects, "next_cursor": next_cursor}
     
     async def get_objects(self, **filter_by) -> list[Base] | Base:
         objects = await self.repository.find_one_or_many(**filter_by)
         return check_objects(objects)
+
+    async def get_object(self, id) -> Base:
+        object = await self.repository.get_by_pk(id)
+        if object is None:
+            raise ObjectNotFoundException
+        return object
         
+    async def get_object_json(self, schema: type[BaseModel], id) -> tuple[bytes, str]:
+        """Encoded `schema` body of one row and its ETag, rendered once per row version"""
+        table = self.repository.model.__tablename__
+
+        async def render():
+            object = await self.repository.get_by_pk(id)
+            if object is None:
+                return None
+            body = schema.model_validate(object, from_attributes=True).model_dump_json().encode()
+            return body, make_etag(body)
+
+        rendered = await response_cache.get_or_load((table, "detail", id), render, tags=[(table, id)])
+        if rendered is None:
+            raise ObjectNotFoundException
+        return rendered
+
+    async def get_page_json(self, schema: type[BaseModel], limit: int, cursor: str | None = None) -> tuple[bytes, str]:
+        """Encoded `schema` body of a page and its ETag, dropped by any write to the table"""
+        table = self.repository.model.__tablename__
+
+        async def render():
+            page = await self.get_page(limit=limit, cursor=cursor)
+            body = schema.model_validate(page, from_attributes=True).model_dump_json().encode()
+            return body, make_etag(body)
+
+        return await response_cache.get_or_load((table, "page", limit, cursor), render, tags=[(table,)])
+
+    async def suggest(self, prefix: str, limit: int) -> list[dict]:
+        key = (prefix.strip().lower(), limit)
+        if self.suggest_cache is None:
+            return await self.repository.suggest(key[0], limit)
+        return await self.suggest_cache.get_or_load(
+            key,
+            lambda: self.repository.suggest(key[0], limit),
+            tags=[(self.repository.model.__tablename__,)],
+        )
+
     async def delete_objects(self, **filter_by) -> list[Base] | Base:
         objects = await self.repository.delete_one_or_more(**filter_by)
+        await self.repository.commit()
         return check_objects(objects)
         
     async def update_objects(self, data: dict, **filter_by) -> list[Base] | Base:
         objects = await self.repository.update_one_or_more(data, **filter_by)
+        await self.repository.commit()
         return check_objects(objects)
         
 class CategoryService(CRUDService):
-    pass
+    suggest_cache = LRUCache(maxsize=1024, ttl=300, name="category_suggestions")
 
 class ProductService(CRUDService):
-    pass  
-        
\ No newline at end of file
+    suggest_cache = LRUCache(maxsize=4096, ttl=300, name="product_suggestions")
+    # facet counts keyed by normalized filter; a short TTL bounds staleness
+    facet_cache: LRUCache | None = LRUCache(maxsize=512, ttl=30, name="product_facets")
+
+    async def get_filtered_page(self, filters: dict, sort: str, limit: int, cursor: str | None = None) -> dict:
+        try:
+            objects, next_cursor = await self.repository.get_filtered_page(
+                filters, sort=sort, limit=limit, cursor=cursor
+            )
+        except ValueError:
+            raise InvalidCursorException
+        return {"items": objects, "next_cursor": next_cursor}
+
+    async def search(self, text: str, limit: int, offset: int = 0) -> dict:
+        objects, next_offset = await self.repository.search(text, limit=limit, offset=offset)
+        return {"items": objects, "next_offset": next_offset}
+        
+    async def get_facets(self, filters: dict) -> dict:
+        key = tuple(sorted((name, value) for name, value in filters.items() if value is not None))
+        if self.facet_cache is not None:
+            facets = self.facet_cache.get(key)
+            if facets is not None:
+                return facets
+
+        facets = {"total": 0, "in_stock": 0, "categories": [], "price_buckets": []}
+        bucket_upper = dict(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:]))
+        for row in await self.repository.facets(filters):
+            if row["grouping_id"] == 1:
+                facets["categories"].append(
+                    {"category_id": row["category_id"], "count": row["count"]}
+                )
+            elif row["grouping_id"] == 2:
+                facets["price_buckets"].append({
+                    "min_price_cents": row["price_bucket"],
+                    "max_price_cents": bucket_upper.get(row["price_bucket"]),
+                    "count": row["count"],
+                })
+            else:
+                facets["total"] = row["count"]
+                facets["in_stock"] = row["in_stock"]
+
+        facets["categories"].sort(key=lambda facet: facet["count"], reverse=True)
+        facets["price_buckets"].sort(key=lambda facet: facet["min_price_cents"])
+        if self.facet_cache is not None:
+            self.facet_cache.set(key, facets)
+        return facets
+
+    async def export_catalog(self, format: str) -> AsyncIterator[bytes]:
+        """Encode the whole catalog as NDJSON or CSV, one chunk per batch"""
+        columns = [getattr(self.repository.model, name) for name in EXPORT_COLUMNS]
+        if format == "csv":
+            yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+        async for rows in self.repository.stream_rows(columns, batch_size=EXPORT_BATCH_SIZE):
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    [export_value(row[name]) for name in EXPORT_COLUMNS] for row in rows
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(
+                    json.dumps({name: export_value(row[name]) for name in EXPORT_COLUMNS}) + "\n"
+                    for row in rows
+                ).encode()
+
+    async def bulk_update(self, changes: list[dict]) -> dict:
+        updated = await self.repository.bulk_update(changes)
+        await self.repository.commit()
+        found = {row["id"] for row in updated}
+        missing = [change["id"] for change in changes if change["id"] not in found]
+        return {"updated": updated, "missing": missing}
+
+    async def import_products(self, records: Iterable[ImportRecord], batch_size: int | None = None) -> dict:
+        """Validate and upsert parsed records batch by batch.
+
+        Each batch is one category lookup and one INSERT ... ON CONFLICT
+        (slug), committed on its own. Rows that fail are left out and listed
+        in the report; a slug repeated within the upload keeps its first row.
+        """
+        batch_size = batch_size or IMPORT_BATCH_SIZE
+        report = {"imported": 0, "failed": 0, "errors": []}
+        seen_slugs = set()
+
+        def reject(row: int, errors: list[str]):
+            report["failed"] += 1
+            report["errors"].append({"row": row, "errors": errors})
+
+        for batch in batched(records, batch_size):
+            candidates = []
+            for row, record, error in batch:
+                if error is not None:
+                    reject(row, [error])
+                    continue
+                try:
+                    data = ProductIn.model_validate(record).model_dump()
+                except ValidationError as exc:
+                    reject(row, validation_messages(exc))
+                    continue
+                data["slug"] = slugify(data["name"])
+                if not data["slug"]:
+                    reject(row, ["name: must contain a letter or digit"])
+                elif data["slug"] in seen_slugs:
+                    reject(row, [f"slug: duplicate of an earlier row ({data['slug']})"])
+                else:
+                    seen_slugs.add(data["slug"])
+                    candidates.append((row, data))
+
+            if not candidates:
+                continue
+            known = await self.repository.existing_category_ids({data["category_id"] for _, data in candidates})
+            rows = []
+            for row, data in candidates:
+                if data["category_id"] in known:
+                    rows.append(data)
+                else:
+                    reject(row, [f"category_id: category {data['category_id']} does not exist"])
+            if rows:
+                await self.repository.upsert_many(
+                    rows, conflict_cols=("slug",), update_cols=IMPORT_UPDATE_FIELDS
+                )
+                await self.repository.commit()
+                report["imported"] += len(rows)
+
+        report["errors"].sort(key=lambda error: error["row"])
+        return report
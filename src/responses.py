@@ -0,0 +1,35 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+CATALOG_CACHE_CONTROL = "public, max-age=30"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator derived from the encoded body"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def json_response(
+    request: Request,
+    body: bytes,
+    etag: str | None = None,
+    cache_control: str = CATALOG_CACHE_CONTROL,
+) -> Response:
+    """Raw JSON response answering If-None-Match with 304 Not Modified"""
+    etag = etag or make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
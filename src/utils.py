@@ -1,7 +1,69 @@
+import json
 from abc import ABC, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import UUID
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import delete, func, insert, inspect, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.cache import LRUCache
+from src.invalidation import evict_on_commit, has_pending_evictions, invalidation_bus
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# bound parameters per statement, under the asyncpg (32767) and SQLite (32766) limits
+MAX_BIND_PARAMS = 32_000
+
+
+def dialect_insert(session: AsyncSession, model):
+    """INSERT construct of the session's dialect, which knows ON CONFLICT"""
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def encode_cursor(*values) -> str:
+    """Encode keyset values into an opaque, url-safe cursor"""
+    payload = [
+        value.isoformat() if isinstance(value, datetime)
+        else str(value) if isinstance(value, UUID)
+        else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *columns) -> tuple:
+    """Decode a cursor back into values typed after the given columns.
+
+    The first cursor element is the sort key name, so a cursor issued for one
+    ordering cannot be replayed against another. Raises ValueError on any
+    malformed input.
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, *values = json.loads(raw)
+    except Exception as exc:
+        raise ValueError("invalid cursor") from exc
+
+    if key != columns[0].key or len(values) != len(columns):
+        raise ValueError("invalid cursor")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(python_type(value))
+        except (TypeError, ValueError) as exc:
+            raise ValueError("invalid cursor") from exc
+    return tuple(decoded)
 
 
 class CRUDRepository(ABC):
@@ -13,10 +75,30 @@ class CRUDRepository(ABC):
     async def get_all(self):
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_page(self):
+        raise NotImplementedError
+
     @abstractmethod
     async def find_one_or_many(self):
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_by_pk(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def find_first(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exists(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def count(self):
+        raise NotImplementedError
+
     @abstractmethod
     async def update_one_or_more(self):
         raise NotImplementedError
@@ -25,9 +107,36 @@ class CRUDRepository(ABC):
     async def delete_one_or_more(self):
         raise NotImplementedError
 
+    @abstractmethod
+    async def create_many(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert_many(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_many(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self):
+        raise NotImplementedError
+
 
 class SqlAlchemyCRUDRepository(CRUDRepository):
     model = None
+    # opt-in read-through cache for single-row lookups by one of cache_fields;
+    # entries are tagged (tablename, id), entries spanning many rows (tablename,),
+    # and every write drops them in all caches, here and, through the
+    # invalidation bus, in every other worker
+    cache: LRUCache | None = None
+    cache_fields = ("id",)
+    # "orm" writes go through the unit of work (events, flush);
+    # "core" writes are a single INSERT/UPDATE ... RETURNING statement.
+    # Either can be overridden per call with write_mode=. Writes only flush:
+    # the service owning the request commits once, through commit().
+    write_mode = "orm"
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -37,28 +146,219 @@ class SqlAlchemyCRUDRepository(CRUDRepository):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def get_page(
+        self,
+        *filter,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+        order_by=None,
+        descending: bool = True,
+        options=(),
+    ):
+        """Keyset pagination over (order_by, id).
+
+        Returns the page and the cursor of the next one (None on the last page).
+        Every page is a bounded index range scan, however deep the client is.
+        `options` are loader options, e.g. a load_only projection.
+        """
+        order_by = self.model.created_at if order_by is None else order_by
+        limit = min(limit, MAX_PAGE_SIZE)
+        key = (order_by, self.model.id)
+
+        query = select(self.model).options(*options).filter(*filter)
+        if cursor:
+            boundary = tuple_(*decode_cursor(cursor, *key))
+            query = query.filter(
+                tuple_(*key) < boundary if descending else tuple_(*key) > boundary
+            )
+        query = query.order_by(
+            *(column.desc() if descending else column.asc() for column in key)
+        ).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        objects = result.scalars().all()
+        if len(objects) <= limit:
+            return objects, None
+
+        objects = objects[:limit]
+        last = objects[-1]
+        next_cursor = encode_cursor(
+            order_by.key, *(getattr(last, column.key) for column in key)
+        )
+        return objects, next_cursor
+
+    async def stream_rows(self, columns, *filter, batch_size: int = 1000):
+        """Yield lists of row mappings from a server-side cursor.
+
+        Rows are fetched batch_size at a time and never hydrated into ORM
+        objects, so memory stays flat however many rows match.
+        """
+        query = (
+            select(*columns)
+            .filter(*filter)
+            .order_by(self.model.created_at, self.model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(query)
+        async for rows in result.mappings().partitions(batch_size):
+            yield rows
+
     async def find_one_or_many(self, *filter, **filter_by):
+        field = self._cached_field(filter, filter_by)
+        if field is not None:
+            obj = await self._get_cached(field, filter_by[field])
+            return [obj] if obj is not None else []
+
         query = select(self.model).filter(*filter).filter_by(**filter_by)
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def create(self, data: dict):
+    async def get_by_pk(self, id):
+        """Row by primary key, or None.
+
+        Looks in the session's identity map first, then the cache (if any),
+        and only then queries.
+        """
+        if not self._cache_usable():
+            return await self.session.get(self.model, id)
+
+        obj = self.session.identity_map.get(self.session.identity_key(self.model, id))
+        # skip objects missing columns (expired, or loaded through a projection)
+        if obj is not None and inspect(obj).unloaded.isdisjoint(inspect(self.model).column_attrs.keys()):
+            return obj
+        return await self._get_cached("id", id)
+
+    async def find_first(self, *filter, **filter_by):
+        """First matching row (LIMIT 1), or None"""
+        field = self._cached_field(filter, filter_by)
+        if field is not None:
+            return await self._get_cached(field, filter_by[field])
+
+        query = select(self.model).filter(*filter).filter_by(**filter_by).limit(1)
+        result = await self.session.execute(query)
+        return result.scalars().first()
+
+    async def exists(self, *filter, **filter_by) -> bool:
+        query = select(self.model.id).filter(*filter).filter_by(**filter_by)
+        result = await self.session.execute(select(query.exists()))
+        return result.scalar()
+
+    async def count(self, *filter, **filter_by) -> int:
+        query = select(func.count()).select_from(self.model).filter(*filter).filter_by(**filter_by)
+        result = await self.session.execute(query)
+        return result.scalar_one()
+
+    def _cached_field(self, filter, filter_by) -> str | None:
+        """The cache field a lookup can be served by: a lone filter_by on one of cache_fields"""
+        if not self._cache_usable() or filter or len(filter_by) != 1:
+            return None
+        field = next(iter(filter_by))
+        return field if field in self.cache_fields else None
+
+    async def _get_cached(self, field: str, value):
+        """Single-row lookup served from the cache when possible.
+
+        The cache holds plain column snapshots, not ORM objects, so entries are
+        never tied to the session that loaded them; a hit is merged into this
+        session without a query.
+        """
+        async def load():
+            result = await self.session.execute(
+                select(self.model).filter_by(**{field: value})
+            )
+            obj = result.scalars().first()
+            return None if obj is None else self._snapshot(obj)
+
+        snapshot = await self.cache.get_or_load(
+            (self.model.__tablename__, field, value),
+            load,
+            tags=lambda snapshot: [self._cache_tag(snapshot["id"])],
+        )
+        if snapshot is None:
+            return None
+
+        obj = self.model(**snapshot)
+        make_transient_to_detached(obj)
+        return await self.session.merge(obj, load=False)
+
+    def _snapshot(self, obj) -> dict:
+        return {attr.key: getattr(obj, attr.key) for attr in inspect(self.model).column_attrs}
+
+    def _cache_tag(self, id):
+        return (self.model.__tablename__, id)
+
+    async def _written(self, ids):
+        """Schedule cache invalidation for rows written in this transaction.
+
+        Other workers are told through a NOTIFY sent inside the transaction,
+        this worker evicts when the session commits; both happen only if the
+        write is committed.
+        """
+        if self.cache is None or not ids:
+            return
+        await invalidation_bus.publish(self.session, self.model.__tablename__, ids)
+        evict_on_commit(self.session, self.model.__tablename__, ids)
+
+    def _cache_usable(self) -> bool:
+        # rows written by the open transaction must be read from it, not from
+        # a cache holding the committed version
+        return self.cache is not None and not has_pending_evictions(
+            self.session, self.model.__tablename__
+        )
+
+    async def commit(self):
+        """End the unit of work: repositories only flush, services commit"""
+        await self.session.commit()
+
+    async def rollback(self):
+        await self.session.rollback()
+
+    def _prepare_values(self, data: dict) -> dict:
+        """Column values for a statement-based write of `data`.
+
+        Core statements skip mapper events, so repositories whose models
+        derive columns in before_insert/before_update listeners compute them
+        here instead.
+        """
+        return dict(data)
+
+    def _use_core(self, write_mode: str | None) -> bool:
+        return (write_mode or self.write_mode) == "core"
+
+    async def create(self, data: dict, write_mode: str | None = None):
+        if self._use_core(write_mode):
+            stmt = insert(self.model).values(**self._prepare_values(data)).returning(self.model)
+            result = await self.session.execute(stmt)
+            obj = result.scalar_one()
+            await self._written([obj.id])
+            return obj
+
         obj = self.model(**data)
         self.session.add(obj)
-        await self.session.commit()
-        await self.session.refresh(obj)
+        await self.session.flush()
+        await self._written([obj.id])
         return obj
-        # CORE style
-        # stmt = insert(self.model).values(**data).returning(self.model)
-        # result = await self.session.execute(stmt)
-        # obj = result.scalar_one()
 
-    async def update_one_or_more(self, data, **filter_by):
+    async def update_one_or_more(self, data, write_mode: str | None = None, **filter_by):
         if not filter_by:
             raise ValueError("filter_by cannot be empty")
         if not data:
             raise ValueError("data cannot be empty")
 
+        if self._use_core(write_mode):
+            # onupdate defaults (updated_at) still apply to Core UPDATEs
+            stmt = (
+                update(self.model)
+                .filter_by(**filter_by)
+                .values(**self._prepare_values(data))
+                .returning(self.model)
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+            result = await self.session.execute(stmt)
+            objects = result.scalars().all()
+            await self._written([obj.id for obj in objects])
+            return objects
+
         stmt = select(self.model).filter_by(**filter_by)
         result = await self.session.execute(stmt)
         objects = result.scalars().all()
@@ -66,15 +366,9 @@ class SqlAlchemyCRUDRepository(CRUDRepository):
             for key, value in data.items():
                 setattr(obj, key, value)
 
-        await self.session.commit()
-        for obj in objects:
-            await self.session.refresh(obj)
+        await self.session.flush()
+        await self._written([obj.id for obj in objects])
         return objects
-        # CORE style (faster but doesn't trigger events)
-        # stmt = update(self.model).values(**data).filter_by(**filter_by).returning(self.model)
-        # result = await self.session.execute(stmt)
-        # await self.session.commit()
-        # return result.scalars().all()
 
     async def delete_one_or_more(self, **filter_by):
         if not filter_by:
@@ -82,5 +376,82 @@ class SqlAlchemyCRUDRepository(CRUDRepository):
 
         stmt = delete(self.model).filter_by(**filter_by).returning(self.model)
         result = await self.session.execute(stmt)
-        await self.session.commit()
-        return result.scalars().all()
+        objects = result.scalars().all()
+        await self._written([obj.id for obj in objects])
+        return objects
+
+    def _chunks(self, rows: list, params_per_row: int):
+        size = max(1, MAX_BIND_PARAMS // max(params_per_row, 1))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+    async def _insert_many(self, stmt, rows: list[dict], key_cols=None) -> list:
+        """Run an INSERT for many rows; returns the written objects in input order.
+
+        Rows are matched back by primary key order, or for upserts by
+        `key_cols`: insertmanyvalues cannot batch an ordered RETURNING of
+        an ON CONFLICT statement, and would send one statement per row.
+        """
+        rows = [self._prepare_values(row) for row in rows]
+        stmt = stmt.returning(self.model, sort_by_parameter_order=key_cols is None).execution_options(
+            populate_existing=True
+        )
+        objects = []
+        # executemany with RETURNING is sent as multi-row VALUES (insertmanyvalues)
+        for chunk in self._chunks(rows, max(map(len, rows), default=1) + 1):
+            result = await self.session.execute(stmt, chunk)
+            objects.extend(result.scalars().all())
+
+        if key_cols is not None:
+            position = {tuple(row[col] for col in key_cols): i for i, row in enumerate(rows)}
+            objects.sort(key=lambda obj: position[tuple(getattr(obj, col) for col in key_cols)])
+        await self._written([obj.id for obj in objects])
+        return objects
+
+    async def create_many(self, rows: list[dict]) -> list:
+        """Insert rows in as few statements as the parameter limit allows"""
+        if not rows:
+            return []
+        return await self._insert_many(insert(self.model), rows)
+
+    async def upsert_many(self, rows: list[dict], conflict_cols, update_cols=()) -> list:
+        """Insert rows, updating update_cols of those colliding on conflict_cols.
+
+        With no update_cols colliding rows are left alone and not returned.
+        Returns the written objects in input order.
+        """
+        if not rows:
+            return []
+        stmt = dialect_insert(self.session, self.model)
+        if update_cols:
+            set_ = {name: stmt.excluded[name] for name in update_cols}
+            if "updated_at" in self.model.__table__.c:
+                set_["updated_at"] = func.now()
+            stmt = stmt.on_conflict_do_update(index_elements=list(conflict_cols), set_=set_)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_cols))
+        return await self._insert_many(stmt, rows, key_cols=tuple(conflict_cols))
+
+    async def update_many(self, rows: list[dict]) -> None:
+        """Update rows by primary key, each dict holding "id" and the new values.
+
+        Rows sharing the same keys go out as one executemany UPDATE per chunk.
+        """
+        if not rows:
+            return
+        rows = [self._prepare_values(row) for row in rows]
+        for chunk in self._chunks(rows, max(map(len, rows))):
+            await self.session.execute(update(self.model), chunk)
+
+        await self._written([row["id"] for row in rows])
+
+    async def delete_many(self, ids) -> list:
+        """Delete rows by primary key; returns the ids that existed"""
+        deleted = []
+        for chunk in self._chunks(list(ids), 1):
+            stmt = delete(self.model).where(self.model.id.in_(chunk)).returning(self.model.id)
+            result = await self.session.execute(stmt)
+            deleted.extend(result.scalars().all())
+
+        await self._written(deleted)
+        return deleted
@@ -1,6 +1,7 @@
 import pytest
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
+from src.cache import CACHES
 from src.db import Base
 
 from typing import AsyncGenerator
@@ -29,4 +30,10 @@ async def get_session(setup_database) -> AsyncGenerator[AsyncSession, None]:
     
     await session.close()
     await transaction.rollback()
-    await connection.close()
\ No newline at end of file
+    await connection.close()
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    for cache in CACHES.values():
+        cache.clear()
@@ -0,0 +1,30 @@
+from src.cart.repository import CartItemRepository, CartRepository
+from src.cart.service import CartService
+from src.products.repository import ProductRepository
+
+import pytest
+
+
+@pytest.fixture
+async def product(async_client):
+    category = await async_client.post(url="/categories", json={"name": "Books"})
+    response = await async_client.post(
+        url="/products",
+        json={
+            "name": "Dune",
+            "description": "Sci-fi",
+            "price_cents": 1500,
+            "stock": 10,
+            "is_active": True,
+            "category_id": category.json()["id"],
+        },
+    )
+    return response.json()
+
+@pytest.fixture
+def cart_service(get_session):
+    return CartService(
+        cart_repo=CartRepository(session=get_session),
+        cart_item_repo=CartItemRepository(session=get_session),
+        product_repo=ProductRepository(session=get_session),
+    )
@@ -0,0 +1,196 @@
+import pytest
+from sqlalchemy import delete
+
+from src.cart.models import Cart
+
+
+@pytest.mark.integration
+async def test_get_cart_requires_authentication(async_client):
+    response = await async_client.get(url="/carts")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+async def test_get_cart_conditional_get(logged_in_client, product):
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 2})
+
+    first = await logged_in_client.get(url="/carts")
+    etag = first.headers["etag"]
+    unchanged = await logged_in_client.get(url="/carts", headers={"If-None-Match": etag})
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 1})
+    changed = await logged_in_client.get(url="/carts", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.json()["total_items"] == 2
+    assert first.json()["total_price_cents"] == 3000
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert changed.json()["total_items"] == 3
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.integration
+async def test_get_cart_does_not_load_product_description(logged_in_client, product, get_session, mocker):
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 1})
+    execute = mocker.spy(get_session, "execute")
+
+    response = await logged_in_client.get(url="/carts")
+
+    assert response.json()["items"][0]["product"]["name"] == "Dune"
+    cart_query, = [str(call.args[0]) for call in execute.call_args_list if "JOIN products" in str(call.args[0])]
+    assert "description" not in cart_query
+
+
+@pytest.mark.integration
+async def test_add_item_commits_cart_and_item_once(logged_in_client, product, get_session, mocker):
+    commit = mocker.spy(get_session, "commit")
+
+    response = await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 1})
+
+    assert response.status_code == 201
+    assert commit.call_count == 1
+
+
+@pytest.mark.integration
+async def test_add_item_increments_within_stock(logged_in_client, product):
+    first = await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 4})
+    second = await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 6})
+    over = await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 1})
+
+    cart = (await logged_in_client.get(url="/carts")).json()
+    assert (first.status_code, second.status_code, over.status_code) == (201, 201, 400)
+    assert over.json()["detail"] == "Insufficient stock for requested quantity"
+    assert len(cart["items"]) == 1
+    assert cart["items"][0]["quantity"] == 10
+
+
+@pytest.mark.integration
+async def test_add_item_rejects_unknown_and_inactive_products(logged_in_client, product):
+    await logged_in_client.put(url=f"/products/{product['id']}", json={**product, "is_active": False})
+
+    inactive = await logged_in_client.post(url="/carts/items", json={"product_id": product["id"]})
+    unknown = await logged_in_client.post(
+        url="/carts/items", json={"product_id": "00000000-0000-0000-0000-000000000000"}
+    )
+
+    assert inactive.status_code == 400
+    assert inactive.json()["detail"] == "Product is not available"
+    assert unknown.status_code == 404
+
+
+@pytest.mark.integration
+async def test_get_cart_is_one_query(logged_in_client, product, get_session, mocker):
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 2})
+    execute = mocker.spy(get_session, "execute")
+
+    response = await logged_in_client.get(url="/carts")
+
+    body = response.json()
+    cart_queries = [call for call in execute.call_args_list if "carts" in str(call.args[0])]
+    assert len(cart_queries) == 1
+    assert body["items"][0]["subtotal"] == 3000
+    assert (body["total_items"], body["total_price_cents"]) == (2, 3000)
+
+
+@pytest.mark.integration
+async def test_registration_creates_empty_cart(logged_in_client, get_session, mocker):
+    execute = mocker.spy(get_session, "execute")
+
+    response = await logged_in_client.get(url="/carts")
+
+    body = response.json()
+    assert (body["items"], body["total_items"], body["total_price_cents"]) == ([], 0, 0)
+    assert not any("INSERT" in str(call.args[0]) for call in execute.call_args_list)
+
+
+@pytest.mark.integration
+async def test_get_cart_creates_missing_cart(logged_in_client, get_session):
+    await get_session.execute(delete(Cart))
+
+    response = await logged_in_client.get(url="/carts")
+
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+async def create_product(client, category_id, name, stock):
+    response = await client.post(
+        url="/products",
+        json={
+            "name": name,
+            "price_cents": 500,
+            "stock": stock,
+            "is_active": True,
+            "category_id": category_id,
+        },
+    )
+    return response.json()
+
+
+@pytest.mark.integration
+async def test_batch_operations_apply_in_one_transaction(logged_in_client, product, get_session, mocker):
+    other = await create_product(logged_in_client, product["category_id"], "Emma", stock=5)
+    gone = await create_product(logged_in_client, product["category_id"], "Ulysses", stock=5)
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 2})
+    await logged_in_client.post(url="/carts/items", json={"product_id": gone["id"], "quantity": 1})
+    commit = mocker.spy(get_session, "commit")
+    execute = mocker.spy(get_session, "execute")
+
+    response = await logged_in_client.patch(
+        url="/carts/items",
+        json={
+            "operations": [
+                {"op": "add", "product_id": product["id"], "quantity": 3},
+                {"op": "set", "product_id": other["id"], "quantity": 4},
+                {"op": "remove", "product_id": gone["id"]},
+            ]
+        },
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert {item["product"]["name"]: item["quantity"] for item in body["items"]} == {"Dune": 5, "Emma": 4}
+    assert body["total_price_cents"] == 5 * 1500 + 4 * 500
+    assert commit.call_count == 1
+    product_queries = [call for call in execute.call_args_list if "products" in str(call.args[0])]
+    assert len(product_queries) == 2  # validation and the returned cart view
+
+
+@pytest.mark.integration
+async def test_batch_operations_reject_whole_batch(logged_in_client, product):
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 2})
+
+    response = await logged_in_client.patch(
+        url="/carts/items",
+        json={
+            "operations": [
+                {"op": "remove", "product_id": product["id"]},
+                {"op": "add", "product_id": product["id"], "quantity": 11},
+                {"op": "add", "product_id": "00000000-0000-0000-0000-000000000000", "quantity": 1},
+            ]
+        },
+    )
+
+    cart = (await logged_in_client.get(url="/carts")).json()
+    assert response.status_code == 400
+    assert [error["error"] for error in response.json()["detail"]["errors"]] == [
+        "Insufficient stock. Available: 10, requested: 11",
+        "Product not found",
+    ]
+    assert cart["items"][0]["quantity"] == 2
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize(
+    "operation",
+    [{"op": "add"}, {"op": "remove", "quantity": 1}, {"op": "set", "quantity": 0}, {"op": "clear"}],
+)
+async def test_batch_operations_validate_quantity(logged_in_client, product, operation):
+    response = await logged_in_client.patch(
+        url="/carts/items", json={"operations": [{**operation, "product_id": product["id"]}]}
+    )
+
+    assert response.status_code == 422
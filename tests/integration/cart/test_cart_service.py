@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from src.cart.exceptions import CartValidationException, EmptyCartException
+from src.cart.models import Cart
+
+
+async def cart_owner(session):
+    return (await session.execute(select(Cart.user_id))).scalar_one()
+
+
+@pytest.mark.integration
+async def test_validate_checkout_returns_only_violating_lines(logged_in_client, product, cart_service, get_session):
+    other = await logged_in_client.post(
+        url="/products",
+        json={"name": "Emma", "price_cents": 500, "stock": 5, "is_active": True, "category_id": product["category_id"]},
+    )
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 8})
+    await logged_in_client.post(url="/carts/items", json={"product_id": other.json()["id"], "quantity": 1})
+    await logged_in_client.put(url=f"/products/{product['id']}", json={**product, "stock": 3})
+    user_id = await cart_owner(get_session)
+
+    violations = await cart_service.cart_item_repo.find_checkout_violations(user_id)
+    with pytest.raises(CartValidationException) as exc:
+        await cart_service.validate_cart_for_checkout(user_id)
+
+    assert [(line["name"], line["stock"], line["quantity"]) for line in violations] == [("Dune", 3, 8)]
+    assert exc.value.detail["errors"] == [
+        {
+            "product_id": product["id"],
+            "product_name": "Dune",
+            "error": "Insufficient stock. Available: 3, requested: 8",
+        }
+    ]
+
+
+@pytest.mark.integration
+async def test_validate_checkout_locks_every_cart_product(logged_in_client, product, cart_service, get_session, mocker):
+    await logged_in_client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 2})
+    user_id = await cart_owner(get_session)
+    execute = mocker.spy(get_session, "execute")
+
+    cart = await cart_service.validate_cart_for_checkout(user_id, lock=True)
+
+    sql = str(execute.call_args_list[0].args[0].compile(dialect=asyncpg.dialect()))
+    assert cart["total_items"] == 2
+    assert "AS MATERIALIZED" in sql
+    # the lock is taken inside the CTE, before violations are filtered out
+    assert sql.index("FOR SHARE OF products") < sql.index("cart_lines.stock < cart_lines.quantity")
+
+
+@pytest.mark.integration
+async def test_validate_checkout_rejects_empty_cart(logged_in_client, cart_service, get_session):
+    await logged_in_client.get(url="/carts")
+
+    with pytest.raises(EmptyCartException):
+        await cart_service.validate_cart_for_checkout(await cart_owner(get_session))
@@ -0,0 +1,54 @@
+from src.db import get_session as get_db_session
+from src.main import app
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+
+@pytest.fixture(scope='function')
+def override_dependencies(get_session):
+    app.dependency_overrides[get_db_session] = lambda: get_session
+    yield
+    app.dependency_overrides = {}
+
+@pytest.fixture
+async def async_client(override_dependencies):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+async def logged_in_client(async_client):
+    await async_client.post(
+        url="/auth/register",
+        json={
+            "first_name": "Kanat",
+            "last_name": "Zhetru",
+            "email": "customer@gmail.com",
+            "password": "test123!",
+            "password_confirm": "test123!",
+        },
+    )
+    await async_client.post(
+        url="/auth/login",
+        data={"username": "customer@gmail.com", "password": "test123!"},
+    )
+    return async_client
+
+@pytest.fixture
+async def products(async_client):
+    category = await async_client.post(url="/categories", json={"name": "Books"})
+    created = []
+    for name, price_cents, stock in (("Dune", 1500, 10), ("Emma", 500, 3)):
+        response = await async_client.post(
+            url="/products",
+            json={
+                "name": name,
+                "price_cents": price_cents,
+                "stock": stock,
+                "is_active": True,
+                "category_id": category.json()["id"],
+            },
+        )
+        created.append(response.json())
+    return created
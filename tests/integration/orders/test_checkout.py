@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import func, select
+
+from src.orders.models import Order
+from src.orders.service import OrderService
+
+
+@pytest.mark.integration
+async def test_checkout_requires_authentication(async_client):
+    response = await async_client.post(url="/orders/checkout")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+async def test_checkout_places_order_and_takes_stock(logged_in_client, products, get_session, mocker):
+    dune, emma = products
+    await logged_in_client.post(url="/carts/items", json={"product_id": dune["id"], "quantity": 2})
+    await logged_in_client.post(url="/carts/items", json={"product_id": emma["id"], "quantity": 3})
+    commit = mocker.spy(get_session, "commit")
+
+    response = await logged_in_client.post(url="/orders/checkout")
+
+    order = response.json()
+    cart = (await logged_in_client.get(url="/carts")).json()
+    stock = {p["name"]: p["stock"] for p in (await logged_in_client.get(url="/products")).json()["items"]}
+    assert response.status_code == 201
+    assert commit.call_count == 1
+    assert order["status"] == "pending"
+    assert order["total_amount"] == 2 * 1500 + 3 * 500
+    assert sorted((item["product_name"], item["product_price"], item["quantity"]) for item in order["items"]) == [
+        ("Dune", 1500, 2),
+        ("Emma", 500, 3),
+    ]
+    assert cart["items"] == []
+    assert stock == {"Dune": 8, "Emma": 0}
+
+
+@pytest.mark.integration
+async def test_checkout_rejects_invalid_cart_without_writing(logged_in_client, products, get_session):
+    dune, emma = products
+    await logged_in_client.post(url="/carts/items", json={"product_id": emma["id"], "quantity": 3})
+    await logged_in_client.put(url=f"/products/{emma['id']}", json={**emma, "stock": 1})
+
+    response = await logged_in_client.post(url="/orders/checkout")
+    empty = await logged_in_client.delete(url="/carts")
+    empty_checkout = await logged_in_client.post(url="/orders/checkout")
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["error"] == "Insufficient stock. Available: 1, requested: 3"
+    assert (await get_session.execute(select(func.count()).select_from(Order))).scalar_one() == 0
+    assert empty.status_code == 204
+    assert empty_checkout.json()["detail"] == "Cart is empty"
+
+
+@pytest.mark.integration
+async def test_checkout_retry_with_idempotency_key_replays_first_order(logged_in_client, products, get_session, mocker):
+    dune, _ = products
+    await logged_in_client.post(url="/carts/items", json={"product_id": dune["id"], "quantity": 2})
+    place_order = mocker.spy(OrderService, "checkout")
+
+    first = await logged_in_client.post(url="/orders/checkout", headers={"Idempotency-Key": "attempt-1"})
+    retry = await logged_in_client.post(url="/orders/checkout", headers={"Idempotency-Key": "attempt-1"})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert place_order.call_count == 1
+    assert (await get_session.execute(select(func.count()).select_from(Order))).scalar_one() == 1
@@ -0,0 +1,63 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event, update
+from uuid import UUID, uuid4
+
+from src.orders.models import Order
+
+
+async def place_orders(client, product, count, session=None):
+    base_time = datetime(2025, 10, 10, 10, 10, 0)
+    for i in range(count):
+        await client.post(url="/carts/items", json={"product_id": product["id"], "quantity": 1})
+        order = (await client.post(url="/orders/checkout")).json()
+        if session is not None:
+            # distinct but tied timestamps, like the product paging tests
+            await session.execute(
+                update(Order).where(Order.id == UUID(order["id"])).values(created_at=base_time + timedelta(minutes=i // 2))
+            )
+
+
+@pytest.mark.integration
+async def test_order_history_pages_newest_first(logged_in_client, products, get_session):
+    await place_orders(logged_in_client, products[0], 3, session=get_session)
+    statements = []
+    engine = get_session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+
+    first = (await logged_in_client.get(url="/orders", params={"limit": 2})).json()
+    event.remove(engine, "before_cursor_execute", record)
+    item_queries = [statement for statement in statements if "FROM order_items" in statement]
+    second = (await logged_in_client.get(url="/orders", params={"limit": 2, "cursor": first["next_cursor"]})).json()
+
+    orders = first["items"] + second["items"]
+    keys = [(order["created_at"], order["id"]) for order in orders]
+    assert len({order["id"] for order in orders}) == 3
+    assert keys == sorted(keys, reverse=True)
+    assert second["next_cursor"] is None
+    assert all(order["items"][0]["product_name"] == "Dune" for order in orders)
+    assert len(item_queries) == 1
+
+
+@pytest.mark.integration
+async def test_order_history_rejects_bad_cursor(logged_in_client):
+    response = await logged_in_client.get(url="/orders", params={"cursor": "garbage"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+async def test_get_order(logged_in_client, products):
+    await place_orders(logged_in_client, products[0], 1)
+    order = (await logged_in_client.get(url="/orders")).json()["items"][0]
+
+    found = await logged_in_client.get(url=f"/orders/{order['id']}")
+    missing = await logged_in_client.get(url=f"/orders/{uuid4()}")
+
+    assert found.status_code == 200
+    assert found.json() == order
+    assert missing.status_code == 404
@@ -0,0 +1,133 @@
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import select, update
+
+from src.orders.models import Order, OrderStatus
+from src.orders.repository import OrderItemRepository, OrderRepository
+from src.payments.models import Payment, PaymentOutbox, PaymentStatus
+from src.payments.providers import FakePaymentProvider
+from src.payments.repository import PaymentOutboxRepository, PaymentRepository
+from src.payments.service import PAYMENT_MAX_ATTEMPTS, PaymentService
+from src.products.repository import ProductRepository
+
+
+def payment_service(session, provider):
+    return PaymentService(
+        outbox_repo=PaymentOutboxRepository(session=session),
+        payment_repo=PaymentRepository(session=session),
+        order_repo=OrderRepository(session=session),
+        order_item_repo=OrderItemRepository(session=session),
+        product_repo=ProductRepository(session=session),
+        provider=provider,
+    )
+
+
+async def checkout(client, product, quantity):
+    await client.post(url="/carts/items", json={"product_id": product["id"], "quantity": quantity})
+    return (await client.post(url="/orders/checkout")).json()
+
+
+async def state(session):
+    payment = (await session.execute(select(Payment.status, Payment.stripe_charge_id))).one()
+    order_status = (await session.execute(select(Order.status))).scalar_one()
+    outbox = (await session.execute(select(PaymentOutbox.attempts, PaymentOutbox.last_error))).all()
+    return payment, order_status, outbox
+
+
+@pytest.mark.integration
+async def test_checkout_queues_payment_without_calling_provider(logged_in_client, products, get_session):
+    order = await checkout(logged_in_client, products[0], 2)
+
+    payment, order_status, outbox = await state(get_session)
+    assert payment.status == PaymentStatus.PENDING
+    assert order["status"] == order_status == OrderStatus.PENDING
+    assert outbox == [(0, None)]
+
+
+@pytest.mark.integration
+async def test_free_order_is_processing_without_payment(logged_in_client, products, get_session):
+    response = await logged_in_client.post(
+        url="/products",
+        json={
+            "name": "Leaflet",
+            "price_cents": 0,
+            "stock": 5,
+            "is_active": True,
+            "category_id": products[0]["category_id"],
+        },
+    )
+    order = await checkout(logged_in_client, response.json(), 1)
+
+    assert order["total_amount"] == 0
+    assert order["status"] == OrderStatus.PROCESSING
+    assert (await get_session.execute(select(Order.status))).scalar_one() == OrderStatus.PROCESSING
+    assert (await get_session.execute(select(Payment.id))).all() == []
+    assert (await get_session.execute(select(PaymentOutbox.payment_id))).all() == []
+
+
+@pytest.mark.integration
+async def test_worker_completes_captured_payments(logged_in_client, products, get_session):
+    await checkout(logged_in_client, products[0], 2)
+    provider = FakePaymentProvider()
+
+    claimed = await payment_service(get_session, provider).process_batch()
+
+    payment, order_status, outbox = await state(get_session)
+    assert claimed == 1
+    assert payment.status == PaymentStatus.COMPLETED
+    assert payment.stripe_charge_id.startswith("ch_")
+    assert order_status == OrderStatus.PROCESSING
+    assert outbox == []
+
+
+@pytest.mark.integration
+async def test_worker_cancels_declined_orders_and_restocks(logged_in_client, products, get_session):
+    dune = products[0]
+    await checkout(logged_in_client, dune, 2)
+    provider = FakePaymentProvider(decline_amounts={3000})
+
+    await payment_service(get_session, provider).process_batch()
+
+    payment, order_status, outbox = await state(get_session)
+    stock = (await logged_in_client.get(url=f"/products/{dune['id']}")).json()["stock"]
+    assert payment.status == PaymentStatus.FAILED
+    assert order_status == OrderStatus.CANCELLED
+    assert outbox == []
+    assert stock == 10
+
+
+@pytest.mark.integration
+async def test_worker_retries_provider_errors_later(logged_in_client, products, get_session):
+    await checkout(logged_in_client, products[0], 2)
+    service = payment_service(get_session, FakePaymentProvider(error_amounts={3000}))
+
+    first = await service.process_batch()
+    second = await service.process_batch()
+
+    payment, order_status, outbox = await state(get_session)
+    assert (first, second) == (1, 0)
+    assert payment.status == PaymentStatus.PENDING
+    assert order_status == OrderStatus.PENDING
+    assert outbox == [(1, "ConnectionError('payment provider unavailable')")]
+
+
+@pytest.mark.integration
+async def test_worker_leaves_order_alone_when_last_attempt_errors(logged_in_client, products, get_session):
+    dune = products[0]
+    await checkout(logged_in_client, dune, 2)
+    await get_session.execute(update(PaymentOutbox).values(attempts=PAYMENT_MAX_ATTEMPTS - 1))
+    service = payment_service(get_session, FakePaymentProvider(error_amounts={3000}))
+
+    first = await service.process_batch()
+    await get_session.execute(update(PaymentOutbox).values(available_at=datetime.now(timezone.utc)))
+    second = await service.process_batch()
+
+    payment, order_status, outbox = await state(get_session)
+    flagged = (await get_session.execute(select(PaymentOutbox.needs_reconciliation))).scalar_one()
+    stock = (await logged_in_client.get(url=f"/products/{dune['id']}")).json()["stock"]
+    assert (first, second) == (1, 0)
+    assert payment.status == PaymentStatus.PENDING
+    assert order_status == OrderStatus.PENDING
+    assert outbox == [(PAYMENT_MAX_ATTEMPTS, "ConnectionError('payment provider unavailable')")]
+    assert flagged
+    assert stock == 8
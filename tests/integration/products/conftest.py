@@ -0,0 +1,26 @@
+from src.auth.models import User
+
+import pytest
+from sqlalchemy import update
+
+
+@pytest.fixture
+async def category(async_client):
+    response = await async_client.post(url="/categories", json={"name": "Books"})
+    return response.json()
+
+@pytest.fixture
+async def admin_client(async_client, get_session):
+    await async_client.post(
+        url="/auth/register",
+        json={
+            "first_name": "Admin",
+            "last_name": "User",
+            "email": "admin@gmail.com",
+            "password": "test123!",
+            "password_confirm": "test123!",
+        },
+    )
+    await get_session.execute(update(User).filter_by(email="admin@gmail.com").values(is_superuser=True))
+    await async_client.post(url="/auth/login", data={"username": "admin@gmail.com", "password": "test123!"})
+    return async_client
@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.integration
+async def test_list_categories_reflects_writes(async_client, category):
+    first = await async_client.get(url="/categories")
+    await async_client.post(url="/categories", json={"name": "Games"})
+    second = await async_client.get(url="/categories")
+    await async_client.put(url=f"/categories/{category['id']}", json={"name": "Comics"})
+    third = await async_client.get(url="/categories")
+
+    assert [c["name"] for c in first.json()["items"]] == ["Books"]
+    assert sorted(c["name"] for c in second.json()["items"]) == ["Books", "Games"]
+    assert sorted(c["slug"] for c in third.json()["items"]) == ["comics", "games"]
+
+
+
+@pytest.mark.integration
+async def test_list_categories_conditional_get(async_client, category):
+    first = await async_client.get(url="/categories")
+    unchanged = await async_client.get(url="/categories", headers={"If-None-Match": first.headers["etag"]})
+    await async_client.post(url="/categories", json={"name": "Games"})
+    changed = await async_client.get(url="/categories", headers={"If-None-Match": first.headers["etag"]})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
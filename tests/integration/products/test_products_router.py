@@ -0,0 +1,301 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.products.schemas import ProductOut
+
+
+async def create_product(async_client, category, name, price_cents, stock=1, is_active=True):
+    response = await async_client.post(
+        url="/products",
+        json={
+            "name": name,
+            "description": f"{name} description",
+            "price_cents": price_cents,
+            "stock": stock,
+            "is_active": is_active,
+            "category_id": category["id"],
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.integration
+async def test_list_products_filtered_and_sorted(async_client, category):
+    await create_product(async_client, category, "Cheap", 100)
+    await create_product(async_client, category, "Middle", 500)
+    await create_product(async_client, category, "Sold out", 700, stock=0)
+    await create_product(async_client, category, "Pricey", 900)
+
+    response = await async_client.get(
+        url="/products",
+        params={"category_id": category["id"], "min_price_cents": 200, "in_stock": True, "sort": "-price"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [product["name"] for product in body["items"]] == ["Pricey", "Middle"]
+    assert body["next_cursor"] is None
+
+
+@pytest.mark.integration
+async def test_list_products_omits_description(async_client, category, get_session, mocker):
+    await create_product(async_client, category, "Lamp", 100)
+    execute = mocker.spy(get_session, "execute")
+
+    response = await async_client.get(url="/products")
+
+    item, = response.json()["items"]
+    assert item["name"] == "Lamp"
+    assert "description" not in item
+    assert "products.description" not in str(execute.call_args.args[0])
+
+
+@pytest.mark.integration
+async def test_list_products_paginates(async_client, category):
+    for i in range(3):
+        await create_product(async_client, category, f"Product {i}", 100 * (i + 1))
+
+    first = await async_client.get(url="/products", params={"sort": "price", "limit": 2})
+    second = await async_client.get(
+        url="/products", params={"sort": "price", "limit": 2, "cursor": first.json()["next_cursor"]}
+    )
+
+    assert [p["name"] for p in first.json()["items"]] == ["Product 0", "Product 1"]
+    assert [p["name"] for p in second.json()["items"]] == ["Product 2"]
+    assert second.json()["next_cursor"] is None
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("params", [
+    {"sort": "stock"},
+    {"min_price_cents": 500, "max_price_cents": 100},
+    {"limit": 1000},
+])
+async def test_list_products_invalid_params(async_client, params):
+    response = await async_client.get(url="/products", params=params)
+
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+async def test_list_products_invalid_cursor(async_client):
+    response = await async_client.get(url="/products", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.integration
+async def test_get_product_serves_cached_body_until_update(async_client, category, mocker):
+    product = await create_product(async_client, category, "Lamp", 1000)
+    validate = mocker.spy(ProductOut, "model_validate")
+
+    first = await async_client.get(url=f"/products/{product['id']}")
+    second = await async_client.get(url=f"/products/{product['id']}")
+    update = await async_client.put(
+        url=f"/products/{product['id']}",
+        json={**product, "price_cents": 1500},
+    )
+    third = await async_client.get(url=f"/products/{product['id']}")
+
+    assert first.status_code == second.status_code == update.status_code == 200
+    assert first.content == second.content
+    assert validate.call_count == 2
+    assert first.json()["price_cents"] == 1000
+    assert third.json()["price_cents"] == 1500
+
+
+@pytest.mark.integration
+async def test_get_product_not_found(async_client):
+    response = await async_client.get(url="/products/92396b9e-bfe5-4d50-b0da-1766316d0e66")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.integration
+async def test_get_product_conditional_get(async_client, category):
+    product = await create_product(async_client, category, "Lamp", 1000)
+
+    first = await async_client.get(url=f"/products/{product['id']}")
+    etag = first.headers["etag"]
+    unchanged = await async_client.get(url=f"/products/{product['id']}", headers={"If-None-Match": f'"other", W/{etag}'})
+    await async_client.put(url=f"/products/{product['id']}", json={**product, "stock": 3})
+    changed = await async_client.get(url=f"/products/{product['id']}", headers={"If-None-Match": etag})
+
+    assert first.headers["cache-control"] == "public, max-age=30"
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.integration
+async def test_export_requires_admin(async_client):
+    response = await async_client.get(url="/products/export")
+
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+async def test_export_ndjson(admin_client, category, mocker):
+    mocker.patch("src.products.service.EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        await create_product(admin_client, category, f"Product {i}", 100 * i)
+
+    response = await admin_client.get(url="/products/export", params={"format": "ndjson"})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert sorted(line["name"] for line in lines) == [f"Product {i}" for i in range(5)]
+    assert lines[0]["category_id"] == category["id"]
+
+
+@pytest.mark.integration
+async def test_export_csv(admin_client, category):
+    await create_product(admin_client, category, "Lamp, brass", 1000)
+
+    response = await admin_client.get(url="/products/export", params={"format": "csv"})
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert rows[0]["name"] == "Lamp, brass"
+    assert rows[0]["price_cents"] == "1000"
+
+
+def ndjson(*records) -> bytes:
+    return "".join(
+        record if isinstance(record, str) else json.dumps(record) + "\n" for record in records
+    ).encode()
+
+
+@pytest.mark.integration
+async def test_import_requires_admin(async_client):
+    response = await async_client.post(
+        url="/products/import", files={"file": ("products.ndjson", b"", "application/x-ndjson")}
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+async def test_import_ndjson_reports_bad_rows(admin_client, category, mocker):
+    mocker.patch("src.products.service.IMPORT_BATCH_SIZE", 2)
+    product = {"price_cents": 100, "stock": 3, "is_active": True, "category_id": category["id"]}
+    body = ndjson(
+        {**product, "name": "Red Mug"},
+        {**product, "name": "Blue Mug", "price_cents": -1},
+        "not json\n",
+        {**product, "name": "red mug"},
+        {**product, "name": "Teapot", "category_id": "00000000-0000-0000-0000-000000000000"},
+        {**product, "name": "Kettle"},
+    )
+
+    response = await admin_client.post(
+        url="/products/import", files={"file": ("products.ndjson", body, "application/x-ndjson")}
+    )
+
+    report = response.json()
+    assert response.status_code == 200
+    assert report["imported"] == 2
+    assert report["failed"] == 4
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4, 5]
+    assert report["errors"][0]["errors"] == ["price_cents: Input should be greater than or equal to 0"]
+    listing = (await admin_client.get(url="/products", params={"sort": "name"})).json()
+    assert [(item["name"], item["slug"]) for item in listing["items"]] == [
+        ("Kettle", "kettle"), ("Red Mug", "red-mug")
+    ]
+
+
+@pytest.mark.integration
+async def test_import_rejects_bad_encoding_before_writing(admin_client, category, mocker):
+    mocker.patch("src.products.service.IMPORT_BATCH_SIZE", 1)
+    product = {"price_cents": 100, "stock": 3, "is_active": True, "category_id": category["id"]}
+    # past the first read of the text stream, so earlier batches would commit
+    body = ndjson(*({**product, "name": f"Mug {i}"} for i in range(200))) + b"\xff\n"
+
+    response = await admin_client.post(
+        url="/products/import", files={"file": ("products.ndjson", body, "application/x-ndjson")}
+    )
+
+    assert response.status_code == 400
+    assert (await admin_client.get(url="/products")).json()["items"] == []
+
+
+@pytest.mark.integration
+async def test_import_csv_updates_existing_slug(admin_client, category):
+    existing = await create_product(admin_client, category, "Desk Lamp", 1000)
+    body = (
+        "name,description,price_cents,stock,is_active,category_id\r\n"
+        f"Desk Lamp,,1500,7,true,{category['id']}\r\n"
+        f"\"Lamp, floor\",Tall,4000,2,false,{category['id']}\r\n"
+    ).encode()
+
+    response = await admin_client.post(
+        url="/products/import",
+        params={"format": "csv"},
+        files={"file": ("products.csv", body, "text/csv")},
+    )
+
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+    updated = (await admin_client.get(url=f"/products/{existing['id']}")).json()
+    assert (updated["price_cents"], updated["stock"], updated["description"]) == (1500, 7, None)
+    listing = (await admin_client.get(url="/products", params={"sort": "name"})).json()
+    assert [item["slug"] for item in listing["items"]] == ["desk-lamp", "lamp-floor"]
+
+
+@pytest.mark.integration
+async def test_bulk_update_requires_admin(async_client):
+    response = await async_client.patch(
+        url="/products/bulk", json={"items": [{"id": "00000000-0000-0000-0000-000000000000", "stock": 1}]}
+    )
+
+    assert response.status_code == 401
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("items", [
+    [],
+    [{"id": "00000000-0000-0000-0000-000000000000"}],
+    [{"id": "00000000-0000-0000-0000-000000000000", "stock": 1}] * 2,
+    [{"id": "00000000-0000-0000-0000-000000000000", "price_cents": -5}],
+])
+async def test_bulk_update_invalid_body(admin_client, items):
+    response = await admin_client.patch(url="/products/bulk", json={"items": items})
+
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+async def test_bulk_update_applies_partial_changes(admin_client, category, mocker):
+    mocker.patch("src.products.repository.BULK_UPDATE_CHUNK_SIZE", 2)
+    mug = await create_product(admin_client, category, "Mug", 100, stock=5)
+    lamp = await create_product(admin_client, category, "Lamp", 2000, stock=1)
+    pen = await create_product(admin_client, category, "Pen", 50, stock=9)
+    await admin_client.get(url=f"/products/{mug['id']}")
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = await admin_client.patch(
+        url="/products/bulk",
+        json={"items": [
+            {"id": mug["id"], "price_cents": 150},
+            {"id": lamp["id"], "stock": 0, "is_active": False},
+            {"id": missing, "stock": 3},
+            {"id": pen["id"], "stock": 10},
+        ]},
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["missing"] == [missing]
+    assert {item["id"]: (item["price_cents"], item["stock"], item["is_active"]) for item in body["updated"]} == {
+        mug["id"]: (150, 5, True),
+        lamp["id"]: (2000, 0, False),
+        pen["id"]: (50, 10, True),
+    }
+    cached = (await admin_client.get(url=f"/products/{mug['id']}")).json()
+    assert cached["price_cents"] == 150
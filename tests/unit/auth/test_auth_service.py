@@ -123,6 +123,7 @@ async def test_create_token_pair(mocker: MockerFixture, sample_user, fixed_utc_t
     auth_service.create_access_token.assert_called_once_with(sample_user)
     auth_service.create_refresh_token.assert_called_once_with(sample_user)
     mock_user_service.set_login_time.assert_called_once_with(sample_user)
+    mock_auth_repo.commit.assert_awaited_once()
     assert token.access_token == "mocked_access_token"
     assert token.refresh_token == "mocked_refresh_token"
     assert token.token_type == 'bearer'
@@ -130,6 +131,7 @@ async def test_create_token_pair(mocker: MockerFixture, sample_user, fixed_utc_t
 @pytest.mark.unit
 async def test_register_new_user_success(mocker: MockerFixture, sample_user):
     mock_auth_repo = mocker.Mock()
+    mock_auth_repo.commit = mocker.AsyncMock()
     mock_user_service = mocker.Mock()
     mock_user_service.get_user_by_username = mocker.AsyncMock(return_value=None)
     mock_user_service.create_new_user = mocker.AsyncMock(return_value=sample_user)
@@ -151,6 +153,7 @@ async def test_register_new_user_success(mocker: MockerFixture, sample_user):
 
     mock_user_service.get_user_by_username.assert_called_once_with("tom@gmail.com")
     mock_user_service.create_new_user.assert_called_once_with(expected_data)
+    mock_auth_repo.commit.assert_awaited_once()
     mocker_hash.assert_called_once_with("plain_password")
     assert result == sample_user
     assert result.email == "tom@gmail.com"
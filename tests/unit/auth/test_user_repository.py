@@ -33,4 +33,18 @@ async def test_create(test_user_repository: UserRepository, get_session: AsyncSe
     query = select(User).filter_by(email="tom@gmail.com")
     db_result = await get_session.execute(query)
     
-    assert db_result.scalar_one().email == "tom@gmail.com"
\ No newline at end of file
+    assert db_result.scalar_one().email == "tom@gmail.com"
+
+@pytest.mark.unit
+async def test_single_row_primitives(test_user_repository: UserRepository, get_session: AsyncSession):
+    user = User(id=UUID("92396b9e-bfe5-4d50-b0da-1766316d0e66"), first_name="tom", last_name="holland", email="tom@gmail.com", password="hashed_password")
+    get_session.add(user)
+    await get_session.commit()
+
+    assert await test_user_repository.get_by_pk(user.id) is user
+    assert await test_user_repository.find_first(email="tom@gmail.com") is user
+    assert await test_user_repository.find_first(email="jerry@gmail.com") is None
+    assert await test_user_repository.exists(email="tom@gmail.com") is True
+    assert await test_user_repository.exists(email="jerry@gmail.com") is False
+    assert await test_user_repository.count(first_name="tom") == 1
+    assert await test_user_repository.count(User.first_name != "tom") == 0
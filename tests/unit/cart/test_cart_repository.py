@@ -0,0 +1,40 @@
+import pytest
+from uuid import uuid4
+from pytest_mock import MockerFixture
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from src.cart.repository import CartItemRepository, CartRepository
+
+
+def compiled(call):
+    return str(call.args[0].compile(dialect=asyncpg.dialect()))
+
+
+@pytest.mark.unit
+async def test_get_quantities_locks_cart_before_reading_items(mocker: MockerFixture):
+    cart_id = uuid4()
+    lock_result = mocker.Mock()
+    lock_result.scalar_one_or_none.return_value = cart_id
+    items_result = mocker.Mock()
+    items_result.all.return_value = []
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(side_effect=[lock_result, items_result])
+
+    assert await CartRepository(session=session).get_quantities(uuid4()) == (cart_id, {})
+
+    lock, items = session.execute.call_args_list
+    assert compiled(lock).endswith("FOR NO KEY UPDATE")
+    assert "FOR" not in compiled(items)
+
+
+@pytest.mark.unit
+async def test_add_quantity_takes_the_cart_lock(mocker: MockerFixture):
+    db_result = mocker.Mock()
+    db_result.mappings.return_value.first.return_value = None
+    session = mocker.Mock()
+    session.bind.dialect.name = "postgresql"
+    session.execute = mocker.AsyncMock(return_value=db_result)
+
+    await CartItemRepository(session=session).add_quantity(uuid4(), uuid4(), 1)
+
+    assert "FOR NO KEY UPDATE OF carts" in compiled(session.execute.call_args)
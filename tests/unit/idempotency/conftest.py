@@ -0,0 +1,11 @@
+import pytest
+
+from src.auth.models import User
+
+
+@pytest.fixture()
+async def user(get_session):
+    user = User(first_name="tom", last_name="holland", email="tom@gmail.com", password="hashed_password")
+    get_session.add(user)
+    await get_session.flush()
+    return user
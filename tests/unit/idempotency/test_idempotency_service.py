@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta, timezone
+from pytest_mock import MockerFixture
+from uuid import uuid4
+
+from src.idempotency import service as idempotency_service
+from src.idempotency.exceptions import IdempotencyKeyReusedException, IdempotencyRequestInProgressException
+from src.idempotency.models import IdempotencyKey
+from src.idempotency.repository import IdempotencyRepository
+from src.idempotency.service import IdempotencyService, request_fingerprint
+
+
+@pytest.fixture
+def mock_repo(mocker: MockerFixture):
+    repo = mocker.Mock()
+    for name in ("claim", "get_record", "save_response", "release", "commit", "rollback"):
+        setattr(repo, name, mocker.AsyncMock())
+    mocker.patch.object(idempotency_service.asyncio, "sleep", mocker.AsyncMock())
+    return repo
+
+
+@pytest.mark.unit
+async def test_run_stores_the_response_in_the_operation_transaction(mock_repo, mocker):
+    mock_repo.claim.return_value = True
+    user_id = uuid4()
+
+    async def operation(save):
+        await save(b'{"id": 1}')
+        assert mock_repo.save_response.await_count == 1  # before the operation commits
+        return b'{"id": 1}'
+
+    result = await IdempotencyService(mock_repo).run(user_id, "k", "f", operation, 201)
+
+    assert result == (201, b'{"id": 1}', False)
+    mock_repo.save_response.assert_awaited_once_with(user_id, "k", 201, b'{"id": 1}')
+    # only the claim: the operation commits its own writes with the response
+    assert mock_repo.commit.await_count == 1
+
+
+@pytest.mark.unit
+async def test_run_waits_for_in_flight_duplicate(mock_repo, mocker):
+    mock_repo.claim.return_value = False
+    mock_repo.get_record.side_effect = [
+        {"fingerprint": "f", "status_code": None, "response_body": None},
+        {"fingerprint": "f", "status_code": None, "response_body": None},
+        {"fingerprint": "f", "status_code": 201, "response_body": b"{}"},
+    ]
+    operation = mocker.AsyncMock()
+
+    result = await IdempotencyService(mock_repo).run(uuid4(), "k", "f", operation, 201)
+
+    assert result == (201, b"{}", True)
+    operation.assert_not_awaited()
+    assert idempotency_service.asyncio.sleep.await_count == 2
+
+
+@pytest.mark.unit
+async def test_run_gives_up_waiting(mock_repo, mocker):
+    mocker.patch.object(idempotency_service, "IDEMPOTENCY_WAIT", 0)
+    mock_repo.claim.return_value = False
+    mock_repo.get_record.return_value = {"fingerprint": "f", "status_code": None, "response_body": None}
+
+    with pytest.raises(IdempotencyRequestInProgressException):
+        await IdempotencyService(mock_repo).run(uuid4(), "k", "f", mocker.AsyncMock(), 201)
+
+
+@pytest.mark.unit
+async def test_run_rejects_key_reused_for_another_request(mock_repo, mocker):
+    mock_repo.claim.return_value = False
+    mock_repo.get_record.return_value = {"fingerprint": "other", "status_code": 201, "response_body": b"{}"}
+
+    with pytest.raises(IdempotencyKeyReusedException):
+        await IdempotencyService(mock_repo).run(uuid4(), "k", "f", mocker.AsyncMock(), 201)
+
+
+@pytest.mark.unit
+async def test_run_releases_the_key_when_the_operation_fails(mock_repo, mocker):
+    mock_repo.claim.return_value = True
+    user_id = uuid4()
+
+    with pytest.raises(RuntimeError):
+        await IdempotencyService(mock_repo).run(user_id, "k", "f", mocker.AsyncMock(side_effect=RuntimeError), 201)
+
+    mock_repo.rollback.assert_awaited_once()
+    mock_repo.release.assert_awaited_once_with(user_id, "k")
+    mock_repo.save_response.assert_not_awaited()
+
+
+@pytest.mark.unit
+async def test_run_keeps_the_claim_when_cancelled(mock_repo, mocker):
+    mock_repo.claim.return_value = True
+
+    with pytest.raises(asyncio.CancelledError):
+        await IdempotencyService(mock_repo).run(
+            uuid4(), "k", "f", mocker.AsyncMock(side_effect=asyncio.CancelledError), 201
+        )
+
+    mock_repo.rollback.assert_not_awaited()
+    mock_repo.release.assert_not_awaited()
+
+
+@pytest.mark.unit
+def test_fingerprint_separates_fields():
+    assert request_fingerprint("POST", "/a", b"b") != request_fingerprint("POST", "/ab", b"")
+
+
+@pytest.mark.unit
+async def test_claim_takes_over_only_expired_or_abandoned_keys(get_session, user):
+    repository = IdempotencyRepository(session=get_session)
+    now = datetime.now(timezone.utc)
+    ttl, lease = timedelta(hours=1), timedelta(seconds=30)
+
+    first = await repository.claim(user.id, "k", "f", now, ttl, lease)
+    in_flight = await repository.claim(user.id, "k", "f", now + timedelta(seconds=10), ttl, lease)
+    abandoned = await repository.claim(user.id, "k", "g", now + timedelta(seconds=31), ttl, lease)
+    await repository.save_response(user.id, "k", 201, b"{}")
+    completed = await repository.claim(user.id, "k", "f", now + timedelta(minutes=30), ttl, lease)
+    expired = await repository.claim(user.id, "k", "h", now + timedelta(hours=2), ttl, lease)
+
+    assert (first, in_flight, abandoned, completed, expired) == (True, False, True, False, True)
+    assert (await repository.get_record(user.id, "k"))["fingerprint"] == "h"
+
+
+@pytest.mark.unit
+async def test_sweep_deletes_expired_keys_in_batches(get_session, user):
+    now = datetime.now(timezone.utc)
+    get_session.add_all(
+        IdempotencyKey(
+            user_id=user.id,
+            key=f"k{i}",
+            fingerprint="f",
+            locked_until=now,
+            expires_at=now + timedelta(hours=-1 if i < 5 else 1),
+        )
+        for i in range(7)
+    )
+    await get_session.flush()
+    repository = IdempotencyRepository(session=get_session)
+
+    deleted = await IdempotencyService(repository).sweep(batch_size=2)
+
+    remaining = [(await repository.get_record(user.id, f"k{i}")) is not None for i in range(7)]
+    assert deleted == 5
+    assert remaining == [False] * 5 + [True] * 2
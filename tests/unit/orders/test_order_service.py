@@ -0,0 +1,83 @@
+import pytest
+from pytest_mock import MockerFixture
+from uuid import uuid4
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.exc import DBAPIError
+
+from src.cart.repository import CartItemRepository
+from src.orders import service as order_service
+from src.orders.exceptions import CheckoutConflictException
+from src.orders.service import OrderService
+
+
+class FakeDriverError(Exception):
+    def __init__(self, sqlstate):
+        self.sqlstate = sqlstate
+
+
+def db_error(sqlstate):
+    return DBAPIError("UPDATE products ...", {}, FakeDriverError(sqlstate))
+
+
+@pytest.fixture
+def checkout_service(mocker: MockerFixture):
+    order_repo = mocker.Mock()
+    order_repo.commit = mocker.AsyncMock()
+    order_repo.rollback = mocker.AsyncMock()
+    service = OrderService(
+        order_repo=order_repo, order_item_repo=mocker.Mock(), cart_item_repo=mocker.Mock(), product_repo=mocker.Mock(),
+        payment_repo=mocker.Mock(),
+    )
+    mocker.patch.object(order_service.asyncio, "sleep", mocker.AsyncMock())
+    return service
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sqlstate", ["40001", "40P01"])
+async def test_checkout_retries_deadlocks_and_serialization_failures(checkout_service, mocker, sqlstate):
+    order = {"id": uuid4()}
+    checkout_service._place_order = mocker.AsyncMock(side_effect=[db_error(sqlstate), order])
+
+    result = await checkout_service.checkout(uuid4())
+
+    assert result is order
+    assert checkout_service._place_order.await_count == 2
+    assert checkout_service.order_repo.rollback.await_count == 1
+    assert checkout_service.order_repo.commit.await_count == 1
+    delay = order_service.asyncio.sleep.await_args.args[0]
+    assert 0 <= delay <= order_service.CHECKOUT_BACKOFF
+
+
+@pytest.mark.unit
+async def test_checkout_gives_up_after_max_attempts(checkout_service, mocker):
+    mocker.patch.object(order_service, "CHECKOUT_ATTEMPTS", 3)
+    checkout_service._place_order = mocker.AsyncMock(side_effect=db_error("40P01"))
+
+    with pytest.raises(CheckoutConflictException):
+        await checkout_service.checkout(uuid4())
+
+    assert checkout_service._place_order.await_count == 3
+    # no backoff after the last attempt
+    assert order_service.asyncio.sleep.await_count == 2
+
+
+@pytest.mark.unit
+async def test_checkout_does_not_retry_other_errors(checkout_service, mocker):
+    checkout_service._place_order = mocker.AsyncMock(side_effect=db_error("23505"))
+
+    with pytest.raises(DBAPIError):
+        await checkout_service.checkout(uuid4())
+
+    assert checkout_service._place_order.await_count == 1
+    assert checkout_service.order_repo.rollback.await_count == 1
+
+
+@pytest.mark.unit
+async def test_checkout_locks_products_in_id_order(mocker: MockerFixture):
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=mocker.Mock())
+
+    await CartItemRepository(session=session).lock_checkout_lines(uuid4())
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=asyncpg.dialect()))
+    assert sql.endswith("ORDER BY products.id FOR UPDATE OF cart_items, products")
@@ -0,0 +1,24 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from pytest_mock import MockerFixture
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from src.payments.repository import PaymentOutboxRepository
+
+
+@pytest.mark.unit
+async def test_claim_skips_rows_locked_by_other_workers(mocker: MockerFixture):
+    db_result = mocker.Mock()
+    db_result.scalars.return_value.all.return_value = []
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=db_result)
+
+    claimed = await PaymentOutboxRepository(session=session).claim(
+        datetime.now(timezone.utc), timedelta(minutes=5), 50
+    )
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=asyncpg.dialect()))
+    assert claimed == []
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert sql.endswith("RETURNING payment_outbox.id")
+    assert session.execute.await_count == 1
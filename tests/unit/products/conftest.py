@@ -0,0 +1,25 @@
+import pytest
+
+from src.products.repository import CategoryRepository, ProductRepository
+from src.products.service import CategoryService, ProductService
+
+
+@pytest.fixture()
+def test_category_repository(get_session):
+    return CategoryRepository(session=get_session)
+
+@pytest.fixture()
+def test_product_repository(get_session):
+    return ProductRepository(session=get_session)
+
+@pytest.fixture()
+def test_category_service(test_category_repository):
+    return CategoryService(repository=test_category_repository)
+
+@pytest.fixture()
+def test_product_service(test_product_repository):
+    return ProductService(repository=test_product_repository)
+
+@pytest.fixture()
+async def sample_category(test_category_repository):
+    return await test_category_repository.create({"name": "Books"})
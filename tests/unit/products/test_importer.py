@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+from src.products.importer import batched, is_decodable, read_rows
+
+
+@pytest.mark.unit
+def test_read_rows_csv_blank_cells_are_none():
+    stream = io.StringIO('name,description\r\n"Lamp, floor",\r\nMug,Blue,extra\r\n')
+
+    assert list(read_rows(stream, "csv")) == [
+        (1, {"name": "Lamp, floor", "description": None}, None),
+        (2, None, "too many fields"),
+    ]
+
+@pytest.mark.unit
+def test_read_rows_ndjson_skips_blank_lines():
+    stream = io.StringIO('{"name": "Mug"}\n\n[1]\n{oops\n')
+
+    rows = list(read_rows(stream, "ndjson"))
+
+    assert rows[0] == (1, {"name": "Mug"}, None)
+    assert rows[1] == (2, None, "expected a JSON object")
+    assert rows[2][0] == 3 and rows[2][2].startswith("invalid JSON")
+
+@pytest.mark.unit
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+@pytest.mark.unit
+def test_is_decodable_reads_across_chunks_and_rewinds():
+    file = io.BytesIO("Café\n".encode() + b"\xff")
+
+    assert is_decodable(io.BytesIO("Café\n".encode()), "utf-8-sig", chunk_size=4)
+    assert not is_decodable(file, "utf-8-sig", chunk_size=4)
+    assert file.tell() == 0
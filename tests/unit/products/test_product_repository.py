@@ -0,0 +1,236 @@
+import pytest
+from pytest_mock import MockerFixture
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from src.products.repository import ProductRepository
+from src.products.service import ProductService
+from src.products.exception import InvalidCursorException
+
+
+async def create_products(repository: ProductRepository, category, count: int):
+    base_time = datetime(2025, 10, 10, 10, 10, 0)
+    products = []
+    for i in range(count):
+        products.append(await repository.create({
+            "name": f"Product {i}",
+            "price_cents": 100 * (i + 1),
+            "stock": i,
+            "is_active": True,
+            "category_id": category.id,
+            "created_at": base_time + timedelta(minutes=i // 2),
+        }))
+    await repository.commit()
+    return products
+
+@pytest.mark.unit
+async def test_get_page_walks_all_rows_once(test_product_repository: ProductRepository, sample_category):
+    await create_products(test_product_repository, sample_category, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = await test_product_repository.get_page(limit=3, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({product.id for product in seen}) == 7
+    keys = [(product.created_at, product.id) for product in seen]
+    assert keys == sorted(keys, reverse=True)
+
+@pytest.mark.unit
+async def test_get_page_last_page_has_no_cursor(test_product_repository: ProductRepository, sample_category):
+    await create_products(test_product_repository, sample_category, 2)
+
+    page, cursor = await test_product_repository.get_page(limit=2)
+
+    assert len(page) == 2
+    assert cursor is None
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cursor", ["garbage", "WyJuYW1lIiwiYSIsImIiXQ"])
+async def test_get_page_invalid_cursor(test_product_service: ProductService, cursor):
+    with pytest.raises(InvalidCursorException):
+        await test_product_service.get_page(limit=10, cursor=cursor)
+
+@pytest.mark.unit
+@pytest.mark.parametrize(("filters", "expected"), [
+    ({"min_price_cents": 300, "max_price_cents": 500}, ["Product 2", "Product 3", "Product 4"]),
+    ({"in_stock": False}, ["Product 0"]),
+    ({"is_active": False}, []),
+])
+async def test_get_filtered_page_filters(test_product_repository: ProductRepository, sample_category, filters, expected):
+    await create_products(test_product_repository, sample_category, 6)
+
+    page, cursor = await test_product_repository.get_filtered_page(filters, sort="price")
+
+    assert [product.name for product in page] == expected
+    assert cursor is None
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sort", ["price", "-price", "name", "-name", "created_at"])
+async def test_get_filtered_page_sorted_walk(test_product_repository: ProductRepository, sample_category, sort):
+    await create_products(test_product_repository, sample_category, 5)
+    column = {"price": "price_cents", "name": "name", "created_at": "created_at"}[sort.lstrip("-")]
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = await test_product_repository.get_filtered_page({}, sort=sort, limit=2, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    keys = [(getattr(product, column), product.id) for product in seen]
+    assert len(seen) == 5
+    assert keys == sorted(keys, reverse=sort.startswith("-"))
+
+@pytest.mark.unit
+async def test_get_filtered_page_rejects_cursor_of_other_sort(test_product_service: ProductService, sample_category):
+    await create_products(test_product_service.repository, sample_category, 3)
+    page = await test_product_service.get_filtered_page({}, sort="price", limit=1)
+
+    with pytest.raises(InvalidCursorException):
+        await test_product_service.get_filtered_page({}, sort="name", limit=1, cursor=page["next_cursor"])
+
+@pytest.mark.unit
+async def test_find_by_id_is_served_from_cache(test_product_repository: ProductRepository, sample_category, mocker: MockerFixture):
+    product, = await create_products(test_product_repository, sample_category, 1)
+    execute = mocker.spy(test_product_repository.session, "execute")
+
+    first = await test_product_repository.find_one_or_many(id=product.id)
+    second = await test_product_repository.find_one_or_many(id=product.id)
+    by_slug = await test_product_repository.find_one_or_many(slug=product.slug)
+
+    assert first == second == by_slug == [product]
+    assert execute.call_count == 2
+
+@pytest.mark.unit
+async def test_update_invalidates_cached_row(test_product_repository: ProductRepository, sample_category):
+    product, = await create_products(test_product_repository, sample_category, 1)
+    await test_product_repository.find_one_or_many(slug=product.slug)
+
+    await test_product_repository.update_one_or_more({"name": "Renamed"}, id=product.id)
+
+    assert await test_product_repository.find_one_or_many(slug="product-0") == []
+    assert (await test_product_repository.find_one_or_many(id=product.id))[0].name == "Renamed"
+
+@pytest.mark.unit
+async def test_cache_hit_is_not_bound_to_loading_session(test_product_repository: ProductRepository, sample_category):
+    product, = await create_products(test_product_repository, sample_category, 1)
+    await test_product_repository.find_one_or_many(id=product.id)
+    test_product_repository.session.expunge_all()
+
+    cached, = await test_product_repository.find_one_or_many(id=product.id)
+
+    assert cached is not product
+    assert cached.name == product.name
+    assert cached in test_product_repository.session
+
+@pytest.mark.unit
+async def test_update_publishes_invalidation(test_product_repository: ProductRepository, sample_category, mocker: MockerFixture):
+    product, = await create_products(test_product_repository, sample_category, 1)
+    publish = mocker.patch("src.utils.invalidation_bus.publish", new=mocker.AsyncMock())
+
+    await test_product_repository.update_one_or_more({"stock": 5}, id=product.id)
+
+    publish.assert_called_once_with(test_product_repository.session, "products", [product.id])
+
+@pytest.mark.unit
+async def test_core_writes_are_one_statement_and_keep_slug(test_product_repository: ProductRepository, sample_category, mocker: MockerFixture):
+    old = datetime(2020, 1, 1)
+    execute = mocker.spy(test_product_repository.session, "execute")
+
+    product = await test_product_repository.create({
+        "name": "Red Mug", "price_cents": 100, "stock": 1, "is_active": True,
+        "category_id": sample_category.id, "updated_at": old,
+    })
+    created_slug = product.slug
+    updated, = await test_product_repository.update_one_or_more({"name": "Blue Mug"}, id=product.id)
+
+    statements = [str(call.args[0]).split()[0] for call in execute.call_args_list]
+    assert statements == ["INSERT", "UPDATE"]
+    assert created_slug == "red-mug"
+    assert updated is product
+    assert (updated.name, updated.slug) == ("Blue Mug", "blue-mug")
+    assert updated.updated_at.replace(tzinfo=None) > old
+
+@pytest.mark.unit
+async def test_orm_write_mode_per_call(test_product_repository: ProductRepository, sample_category):
+    old = datetime(2020, 1, 1)
+    product = await test_product_repository.create({
+        "name": "Lamp", "price_cents": 100, "stock": 1, "is_active": True,
+        "category_id": sample_category.id, "updated_at": old,
+    }, write_mode="orm")
+
+    updated, = await test_product_repository.update_one_or_more({"name": "Desk Lamp"}, write_mode="orm", id=product.id)
+
+    assert updated.slug == "desk-lamp"
+    assert updated.updated_at.replace(tzinfo=None) > old
+
+@pytest.mark.unit
+async def test_batch_writes_chunk_by_bind_params(test_product_repository: ProductRepository, sample_category, mocker: MockerFixture):
+    mocker.patch("src.utils.MAX_BIND_PARAMS", 16)
+    statements = []
+    engine = test_product_repository.session.bind.sync_engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    rows = [
+        {"name": f"Item {i}", "price_cents": i, "stock": 1, "is_active": True, "category_id": sample_category.id}
+        for i in range(5)
+    ]
+
+    created = await test_product_repository.create_many(rows)
+
+    # 7 params per row (slug and id included) -> 2 rows per statement
+    assert len(statements) == 3
+    assert [product.slug for product in created] == [f"item-{i}" for i in range(5)]
+
+    statements.clear()
+    upserted = await test_product_repository.upsert_many(
+        [{**rows[0], "name": "Item new"}, {**rows[0], "price_cents": 999}],
+        conflict_cols=("slug",),
+        update_cols=("price_cents",),
+    )
+    event.remove(engine, "before_cursor_execute", record)
+
+    # both rows in one multi-row statement, returned in input order
+    assert len(statements) == 1
+    assert [(product.slug, product.price_cents) for product in upserted] == [("item-new", 0), ("item-0", 999)]
+    assert upserted[1].id == created[0].id
+
+    deleted = await test_product_repository.delete_many([created[1].id, created[2].id, created[1].id])
+
+    assert sorted(deleted) == sorted([created[1].id, created[2].id])
+    assert len(await test_product_repository.get_all()) == 4
+
+@pytest.mark.unit
+async def test_upsert_many_without_update_cols_skips_conflicts(test_product_repository: ProductRepository, sample_category):
+    row = {"name": "Mug", "price_cents": 1, "stock": 1, "is_active": True, "category_id": sample_category.id}
+    first, = await test_product_repository.create_many([row])
+
+    written = await test_product_repository.upsert_many([{**row, "price_cents": 5}], conflict_cols=("slug",))
+
+    assert written == []
+    assert (await test_product_repository.find_one_or_many(id=first.id))[0].price_cents == 1
+
+@pytest.mark.unit
+async def test_get_by_pk_uses_identity_map_then_cache(test_product_repository: ProductRepository, sample_category, mocker: MockerFixture):
+    product, = await create_products(test_product_repository, sample_category, 1)
+    execute = mocker.spy(test_product_repository.session, "execute")
+
+    assert await test_product_repository.get_by_pk(product.id) is product
+    assert execute.call_count == 0
+
+    test_product_repository.session.expunge_all()
+    loaded = await test_product_repository.get_by_pk(product.id)
+    test_product_repository.session.expunge_all()
+    cached = await test_product_repository.get_by_pk(product.id)
+
+    assert loaded.id == cached.id == product.id
+    assert execute.call_count == 1
@@ -0,0 +1,165 @@
+import pytest
+from pytest_mock import MockerFixture
+from uuid import uuid4
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from src.invalidation import evict_cached_rows
+from src.products.repository import ProductRepository
+from src.products.service import ProductService
+
+
+@pytest.mark.unit
+async def test_search_ranks_over_search_vector(mocker: MockerFixture):
+    db_result = mocker.Mock()
+    db_result.scalars.return_value.all.return_value = []
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=db_result)
+    service = ProductService(repository=ProductRepository(session=session))
+
+    result = await service.search("red shoes", limit=10)
+
+    query = session.execute.call_args.args[0]
+    sql = str(query.compile(dialect=asyncpg.dialect()))
+    assert "products.search_vector @@ websearch_to_tsquery" in sql
+    assert "ts_rank_cd(products.search_vector" in sql
+    assert result == {"items": [], "next_offset": None}
+
+@pytest.mark.unit
+async def test_search_returns_next_offset(mocker: MockerFixture):
+    db_result = mocker.Mock()
+    db_result.scalars.return_value.all.return_value = ["a", "b", "c"]
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=db_result)
+    service = ProductService(repository=ProductRepository(session=session))
+
+    result = await service.search("shoes", limit=2, offset=4)
+
+    assert result == {"items": ["a", "b"], "next_offset": 6}
+
+@pytest.mark.unit
+async def test_suggest_is_cached_per_prefix(mocker: MockerFixture):
+    mock_repo = mocker.Mock()
+    mock_repo.model = ProductRepository.model
+    mock_repo.suggest = mocker.AsyncMock(return_value=[{"name": "Red Shoes", "slug": "red-shoes"}])
+    service = ProductService(repository=mock_repo)
+
+    first = await service.suggest("Red ", limit=10)
+    second = await service.suggest("red", limit=10)
+
+    mock_repo.suggest.assert_called_once_with("red", 10)
+    assert first == second == [{"name": "Red Shoes", "slug": "red-shoes"}]
+
+@pytest.mark.unit
+async def test_committed_product_write_evicts_suggestions(mocker: MockerFixture):
+    mock_repo = mocker.Mock()
+    mock_repo.model = ProductRepository.model
+    mock_repo.suggest = mocker.AsyncMock(return_value=[])
+    service = ProductService(repository=mock_repo)
+
+    await service.suggest("shoes", limit=10)
+    # what the invalidation bus runs for a write committed by any worker
+    evict_cached_rows("products", [uuid4()])
+    await service.suggest("shoes", limit=10)
+
+    assert mock_repo.suggest.call_count == 2
+
+@pytest.mark.unit
+async def test_suggest_query_uses_trigram_operators(mocker: MockerFixture):
+    db_result = mocker.Mock()
+    db_result.mappings.return_value.all.return_value = []
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=db_result)
+
+    await ProductRepository(session=session).suggest("sh_o", limit=5)
+
+    query = session.execute.call_args.args[0]
+    compiled = query.compile(dialect=asyncpg.dialect())
+    sql = str(compiled)
+    assert "products.name ILIKE" in sql
+    assert "<% products.name" in sql
+    assert "word_similarity" in sql
+    assert "sh\\_o%" in compiled.params.values()
+
+@pytest.mark.unit
+async def test_get_facets_assembles_grouping_sets(mocker: MockerFixture):
+    books, games = uuid4(), uuid4()
+    mock_repo = mocker.Mock()
+    mock_repo.facets = mocker.AsyncMock(return_value=[
+        {"grouping_id": 1, "category_id": books, "price_bucket": None, "count": 2, "in_stock": 1},
+        {"grouping_id": 1, "category_id": games, "price_bucket": None, "count": 5, "in_stock": 5},
+        {"grouping_id": 2, "category_id": None, "price_bucket": 50000, "count": 1, "in_stock": 1},
+        {"grouping_id": 2, "category_id": None, "price_bucket": 1000, "count": 6, "in_stock": 5},
+        {"grouping_id": 3, "category_id": None, "price_bucket": None, "count": 7, "in_stock": 6},
+    ])
+    service = ProductService(repository=mock_repo)
+
+    facets = await service.get_facets({"category_id": None, "in_stock": None})
+    cached = await service.get_facets({"in_stock": None, "category_id": None})
+
+    mock_repo.facets.assert_called_once()
+    assert cached is facets
+    assert facets["total"] == 7 and facets["in_stock"] == 6
+    assert facets["categories"] == [
+        {"category_id": games, "count": 5},
+        {"category_id": books, "count": 2},
+    ]
+    assert facets["price_buckets"] == [
+        {"min_price_cents": 1000, "max_price_cents": 2500, "count": 6},
+        {"min_price_cents": 50000, "max_price_cents": None, "count": 1},
+    ]
+
+@pytest.mark.unit
+async def test_facets_query_is_a_single_grouping_sets_statement(mocker: MockerFixture):
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=mocker.Mock())
+
+    await ProductRepository(session=session).facets({"is_active": True})
+
+    session.execute.assert_called_once()
+    sql = str(session.execute.call_args.args[0].compile(dialect=asyncpg.dialect()))
+    assert "GROUP BY GROUPING SETS((products.category_id), (CASE" in sql
+    assert "count(*) FILTER (WHERE products.stock >" in sql
+
+@pytest.mark.unit
+async def test_import_upserts_on_slug_for_postgres(mocker: MockerFixture):
+    category_id = uuid4()
+    db_result = mocker.Mock()
+    db_result.scalars.return_value.all.side_effect = [[category_id], [mocker.Mock(id=uuid4(), slug="red-mug")]]
+    session = mocker.Mock()
+    session.bind.dialect.name = "postgresql"
+    session.execute = mocker.AsyncMock(return_value=db_result)
+    session.commit = mocker.AsyncMock()
+    service = ProductService(repository=ProductRepository(session=session))
+    service.repository.cache = None
+    record = {"name": "Red Mug", "price_cents": "100", "stock": "1", "is_active": "true",
+              "category_id": str(category_id)}
+
+    report = await service.import_products([(1, record, None)])
+
+    stmt, rows = session.execute.call_args.args
+    sql = str(stmt.compile(dialect=asyncpg.dialect()))
+    assert "ON CONFLICT (slug) DO UPDATE SET name = excluded.name" in sql
+    assert "RETURNING products.id" in sql
+    assert rows[0]["slug"] == "red-mug" and rows[0]["price_cents"] == 100
+    assert report == {"imported": 1, "failed": 0, "errors": []}
+
+@pytest.mark.unit
+async def test_bulk_update_is_one_statement_per_chunk(mocker: MockerFixture):
+    mocker.patch("src.products.repository.BULK_UPDATE_CHUNK_SIZE", 2)
+    db_result = mocker.Mock()
+    db_result.mappings.return_value.all.return_value = []
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock(return_value=db_result)
+    session.commit = mocker.AsyncMock()
+    service = ProductService(repository=ProductRepository(session=session))
+    changes = [{"id": uuid4(), "price_cents": None, "stock": 1, "is_active": None} for _ in range(3)]
+
+    result = await service.bulk_update(changes)
+
+    assert session.execute.await_count == 2
+    session.commit.assert_awaited_once()
+    sql = str(session.execute.call_args_list[0].args[0].compile(dialect=asyncpg.dialect()))
+    assert "WITH changes(id, price_cents, stock, is_active) AS" in sql
+    assert "stock=coalesce(CAST(changes.stock AS INTEGER), products.stock)" in sql
+    assert "FROM changes WHERE products.id = changes.id RETURNING" in sql
+    assert result["missing"] == [change["id"] for change in changes]
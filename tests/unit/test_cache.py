@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.cache import LRUCache
+
+
+@pytest.mark.unit
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+@pytest.mark.unit
+def test_expired_entries_are_misses(mocker: MockerFixture):
+    clock = mocker.patch("src.cache.time.monotonic", return_value=100.0)
+    cache = LRUCache(ttl=10)
+    cache.set("a", 1)
+
+    clock.return_value = 111.0
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+@pytest.mark.unit
+def test_invalidate_tag_drops_every_tagged_entry():
+    cache = LRUCache()
+    cache.set(("products", "id", 1), "by id", tags=[("products", 1)])
+    cache.set(("products", "slug", "shoe"), "by slug", tags=[("products", 1)])
+    cache.set(("products", "id", 2), "other", tags=[("products", 2)])
+
+    cache.invalidate_tag(("products", 1))
+
+    assert cache.get(("products", "id", 1)) is None
+    assert cache.get(("products", "slug", "shoe")) is None
+    assert cache.get(("products", "id", 2)) == "other"
+
+@pytest.mark.unit
+async def test_get_or_load_single_flight():
+    cache = LRUCache()
+    calls = 0
+    release = asyncio.Event()
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    tasks = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert results == ["value"] * 10
+    assert cache.get("key") == "value"
+
+@pytest.mark.unit
+async def test_get_or_load_propagates_errors_to_waiters():
+    cache = LRUCache()
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    tasks = [asyncio.create_task(cache.get_or_load("key", loader)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert cache.get("key") is None
+
+@pytest.mark.unit
+async def test_get_or_load_skips_store_when_invalidated_mid_load():
+    cache = LRUCache()
+
+    async def loader():
+        cache.invalidate_tag(("products", 1))
+        return "stale"
+
+    result = await cache.get_or_load("key", loader, tags=[("products", 1)])
+
+    assert result == "stale"
+    assert cache.get("key") is None
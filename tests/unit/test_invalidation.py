@@ -0,0 +1,126 @@
+import asyncio
+from uuid import uuid4
+
+import asyncpg as asyncpg_driver
+import pytest
+from pytest_mock import MockerFixture
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from src import invalidation
+from src.cache import CACHES, LRUCache
+from src.invalidation import (
+    InvalidationBus,
+    LocalTransport,
+    PostgresTransport,
+    decode_message,
+    encode_messages,
+    evict_on_commit,
+    has_pending_evictions,
+)
+from tests.conftest import session_factory
+
+
+@pytest.mark.unit
+def test_encode_messages_splits_under_payload_limit():
+    ids = [uuid4() for _ in range(500)]
+
+    messages = encode_messages("products", ids)
+
+    assert len(messages) > 1
+    assert all(len(message) < 8000 for message in messages)
+    decoded = [id for message in messages for id in decode_message(message)[1]]
+    assert decoded == ids
+
+@pytest.mark.unit
+async def test_local_transport_delivers_to_other_workers(mocker: MockerFixture):
+    channel = []
+    worker_a = InvalidationBus(LocalTransport(channel))
+    worker_b = InvalidationBus(LocalTransport(channel))
+    received = mocker.Mock()
+    worker_b.subscribe(received)
+    await worker_a.start()
+    await worker_b.start()
+    product_id = uuid4()
+
+    await worker_a.publish(mocker.Mock(), "products", [product_id])
+
+    received.assert_called_once_with("products", [product_id])
+    await worker_b.stop()
+    await worker_a.publish(mocker.Mock(), "products", [product_id])
+    received.assert_called_once()
+
+@pytest.mark.unit
+async def test_bus_evicts_tagged_entries_and_resets_on_connect(mocker: MockerFixture):
+    cache = LRUCache()
+    product_id = uuid4()
+    bus = InvalidationBus(LocalTransport())
+    bus.subscribe(lambda table, ids: [cache.invalidate_tag((table, id)) for id in ids], on_reset=cache.clear)
+    cache.set("stale", "price", tags=[("products", product_id)])
+    cache.set("other", "price")
+
+    bus.dispatch(f"products:{product_id}")
+
+    assert cache.get("stale") is None
+    assert cache.get("other") == "price"
+    await bus.start()
+    assert len(cache) == 0
+
+@pytest.mark.unit
+async def test_postgres_transport_notifies_inside_transaction(mocker: MockerFixture):
+    session = mocker.Mock()
+    session.execute = mocker.AsyncMock()
+
+    await PostgresTransport("postgresql://test").publish(session, "products:1")
+
+    sql = str(session.execute.call_args.args[0].compile(dialect=asyncpg.dialect()))
+    assert "pg_notify" in sql
+
+@pytest.fixture
+def pending_cache():
+    cache = LRUCache(name="test_pending")
+    yield cache
+    CACHES.pop("test_pending", None)
+
+@pytest.mark.unit
+@pytest.mark.parametrize(("commit", "evicted"), [(True, True), (False, False)])
+async def test_evict_on_commit_waits_for_the_transaction(pending_cache, commit, evicted):
+    cache = pending_cache
+    id = uuid4()
+    cache.set("row", "value", tags=[("products", id)])
+    # a session of its own: committing the get_session one would end the
+    # fixture's outer transaction
+    async with session_factory() as session:
+        await session.execute(select(1))
+
+        evict_on_commit(session, "products", [id])
+        assert has_pending_evictions(session, "products")
+        assert cache.get("row") == "value"
+
+        if commit:
+            await session.commit()
+        else:
+            await session.rollback()
+
+        assert not has_pending_evictions(session, "products")
+    assert (cache.get("row") is None) is evicted
+
+@pytest.mark.unit
+async def test_postgres_transport_retries_when_listen_fails(mocker: MockerFixture):
+    dropped = mocker.Mock()
+    dropped.add_listener = mocker.AsyncMock(side_effect=asyncpg_driver.ConnectionDoesNotExistError("closed"))
+    healthy = mocker.Mock()
+    healthy.add_listener = mocker.AsyncMock()
+    healthy.close = mocker.AsyncMock()
+    mocker.patch.object(invalidation.asyncpg, "connect", mocker.AsyncMock(side_effect=[dropped, healthy]))
+    mocker.patch.object(invalidation.asyncio, "sleep", mocker.AsyncMock())
+    connected = asyncio.Event()
+    transport = PostgresTransport("postgresql://test")
+
+    await transport.start(mocker.Mock(), connected.set)
+    await asyncio.wait_for(connected.wait(), timeout=1)
+    await transport.stop()
+
+    dropped.terminate.assert_called_once()
+    healthy.add_listener.assert_awaited_once()
+    healthy.close.assert_awaited_once()